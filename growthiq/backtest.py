@@ -0,0 +1,291 @@
+# backtest.py
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+# Fundamental panels used by the growth screen: name -> (data section, field)
+FUNDAMENTAL_FIELDS = {
+    'Revenue': ('Financials', 'Total Revenue'),
+    'Net Income': ('Financials', 'Net Income'),
+    'Free Cash Flow': ('Cashflow', 'Free Cash Flow'),
+}
+
+SMA_LENGTHS = [20, 50, 200]
+
+
+# Function to pivot long (column, key, value) records into a key x ticker panel.
+# Keys repeat across tickers, so only the distinct keys are parsed.
+def pivot_long(columns, keys, values, tickers, parse_keys):
+    codes, raw_keys = pd.factorize(pd.Series(keys, dtype=object))
+    key_codes, panel_keys = pd.factorize(parse_keys(pd.Series(raw_keys, dtype=object)), sort=True)
+    rows = np.where(codes >= 0, key_codes[codes] if len(key_codes) else -1, -1)
+    valid = rows >= 0
+    panel = np.full((len(panel_keys), len(tickers)), np.nan)
+    panel[rows[valid], np.asarray(columns, dtype=int)[valid]] = np.asarray(values, dtype=float)[valid]
+    return pd.DataFrame(panel, index=panel_keys, columns=tickers)
+
+
+# Function to build ticker x quarter fundamental panels from pre-fetched index data.
+# Quarters are calendar quarters; a quarter a company did not report stays NaN.
+def build_fundamental_panels(data_list):
+    tickers = [data['Ticker'] for data in data_list]
+    panels = {}
+    for name, (section, field) in FUNDAMENTAL_FIELDS.items():
+        columns, dates, values = [], [], []
+        for column, data in enumerate(data_list):
+            series = (data.get(section) or {}).get(field) or {}
+            columns.extend([column] * len(series))
+            dates.extend(series.keys())
+            values.extend(series.values())
+        panel = pivot_long(columns, dates, values, tickers, to_quarters)
+        if not panel.empty:
+            panel = panel.reindex(pd.period_range(panel.index.min(), panel.index.max(), freq='Q'))
+        panels[name] = panel
+    return panels
+
+
+# Function to build a ticker x day close-price panel from pre-fetched index data
+def build_price_panel(data_list):
+    tickers = [data['Ticker'] for data in data_list]
+    columns, dates, values = [], [], []
+    for column, data in enumerate(data_list):
+        historical_data = data.get('HistoricalData') or {}
+        closes = historical_data.get('Close') or []
+        columns.extend([column] * len(closes))
+        dates.extend((historical_data.get('Date') or [])[:len(closes)])
+        values.extend(closes)
+    return pivot_long(columns, dates, values, tickers, to_trading_days)
+
+
+# Function to convert timestamps (any timezone) to naive trading-day dates
+def to_trading_days(dates):
+    return pd.to_datetime(dates, utc=True, errors='coerce').dt.tz_convert(None).dt.normalize()
+
+
+# Function to convert report dates to calendar quarters
+def to_quarters(dates):
+    return pd.to_datetime(dates, errors='coerce').dt.to_period('Q')
+
+
+# Function to compute the growth (%) of each quarter against `periods` quarters back,
+# with the same semantics as pd.Series.pct_change
+def panel_growth(values, periods):
+    growth = np.full_like(values, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth[periods:] = (values[periods:] / values[:-periods] - 1) * 100
+    growth[~np.isfinite(growth)] = np.nan
+    return growth
+
+
+# Function to get, for every quarter row, the row of the latest reported value per ticker
+def last_valid_rows(values):
+    rows = np.where(np.isfinite(values), np.arange(len(values))[:, None], -1)
+    return np.maximum.accumulate(rows, axis=0)
+
+
+# Function to gather values[rows[..., t], t] per ticker t, where a row of -1 means missing
+def take_rows(values, rows):
+    taken = values[np.clip(rows, 0, None), np.arange(values.shape[1])]
+    return np.where(rows >= 0, taken, np.nan)
+
+
+# Function to compute simple moving averages at the given rows only, using a
+# cumulative sum over the whole panel (a window needs `length` valid prices)
+def sma_at_rows(prices, rows, length):
+    valid = np.isfinite(prices)
+    csum = np.vstack([np.zeros(prices.shape[1]), np.cumsum(np.where(valid, prices, 0.0), axis=0)])
+    ccount = np.vstack([np.zeros(prices.shape[1]), np.cumsum(valid, axis=0)])
+    start = np.clip(rows - length + 1, 0, None)
+    window_sum = csum[rows + 1] - csum[start]
+    window_count = ccount[rows + 1] - ccount[start]
+    sma = window_sum / length
+    sma[(window_count < length) | (rows - length + 1 < 0)[:, None]] = np.nan
+    return sma
+
+
+# Function to evaluate the growth screen at every as-of date and every ticker at once.
+# Everything is point-in-time: a quarter only counts once `report_lag_days` have
+# passed after it ended, and prices are taken at the last trading day <= as-of date.
+# Returns a per-date summary and an as-of x ticker mask of passing tickers.
+def run_backtest(
+    fundamentals,
+    prices,
+    benchmark,
+    growth_type='QoQ',
+    revenue_growth_threshold=10,
+    net_income_growth_threshold=10,
+    fcf_growth_threshold=10,
+    rs_threshold=0,
+    filter_logic='ALL',
+    price_above_sma=(),
+    as_of_dates=None,
+    horizon_days=63,
+    report_lag_days=45,
+    rs_lookback_days=252,
+    max_staleness_quarters=2,
+):
+    tickers = prices.columns
+    dates = prices.index
+    price_values = prices.ffill().to_numpy(dtype=float)
+    benchmark = pd.Series(benchmark.to_numpy(dtype=float), index=to_trading_days(benchmark.index.to_series()).to_numpy())
+    benchmark = benchmark.groupby(level=0).last()
+    benchmark_values = benchmark.reindex(benchmark.index.union(dates)).ffill().reindex(dates).to_numpy(dtype=float)
+
+    # Map each as-of date to the last trading day on or before it
+    if as_of_dates is None:
+        as_of_dates = pd.date_range(dates[0], dates[-1], freq=pd.offsets.QuarterEnd())
+    as_of_dates = pd.DatetimeIndex(as_of_dates)
+    rows = dates.searchsorted(as_of_dates, side='right') - 1
+    keep = rows >= 0
+    as_of_dates, rows = as_of_dates[keep], rows[keep]
+
+    # Latest point-in-time fundamentals per as-of date and ticker
+    periods = 1 if growth_type == 'QoQ' else 4
+    latest, growth = {}, {}
+    for name in FUNDAMENTAL_FIELDS:
+        panel = fundamentals[name].reindex(columns=tickers)
+        values = panel.to_numpy(dtype=float)
+        if len(panel) == 0:
+            latest[name] = growth[name] = np.full((len(rows), len(tickers)), np.nan)
+            continue
+        available = panel.index.to_timestamp(how='end').normalize() + pd.Timedelta(days=report_lag_days)
+        quarter_rows = available.searchsorted(as_of_dates, side='right') - 1
+        reported_rows = last_valid_rows(values)[np.clip(quarter_rows, 0, None)]
+        stale = (quarter_rows[:, None] < 0) | (quarter_rows[:, None] - reported_rows > max_staleness_quarters)
+        reported_rows = np.where(stale, -1, reported_rows)
+        latest[name] = take_rows(values, reported_rows)
+        growth[name] = take_rows(panel_growth(values, periods), reported_rows)
+
+    # Price-based signals at the as-of rows
+    price_now = price_values[rows]
+    sma_flags = {}
+    for length in SMA_LENGTHS:
+        sma = sma_at_rows(price_values, rows, length)
+        with np.errstate(invalid='ignore'):
+            sma_flags[length] = price_now > sma
+
+    # Relative strength over the lookback window (or since the first price, as in the live screen)
+    first_valid = np.where(np.isfinite(price_values).any(axis=0), np.isfinite(price_values).argmax(axis=0), len(dates))
+    base_rows = np.maximum(rows[:, None] - rs_lookback_days, first_valid[None, :])
+    has_window = base_rows < rows[:, None]
+    base_rows = np.clip(base_rows, 0, len(dates) - 1)
+    stock_return = price_now / price_values[base_rows, np.arange(len(tickers))] - 1
+    benchmark_return = benchmark_values[rows][:, None] / benchmark_values[base_rows] - 1
+    relative_strength = np.where(has_window, (stock_return - benchmark_return) * 100, np.nan)
+
+    # Screen: eligibility mirrors the live screen (positive latest revenue and net
+    # income, complete growth data), then thresholds combined with ALL/ANY logic
+    with np.errstate(invalid='ignore'):
+        eligible = (latest['Revenue'] > 0) & (latest['Net Income'] > 0) & np.isfinite(relative_strength)
+        for name in FUNDAMENTAL_FIELDS:
+            eligible &= np.isfinite(growth[name])
+        conditions = [
+            growth['Revenue'] >= revenue_growth_threshold,
+            growth['Net Income'] >= net_income_growth_threshold,
+            growth['Free Cash Flow'] >= fcf_growth_threshold,
+            relative_strength >= rs_threshold,
+        ]
+    if filter_logic == 'ALL':
+        passing = np.logical_and.reduce(conditions)
+    else:
+        passing = np.logical_or.reduce(conditions)
+    passing &= eligible
+    for length in price_above_sma:
+        passing &= sma_flags[int(length)]
+
+    # Forward returns of the passing (equal-weight) baskets
+    forward_rows = rows + horizon_days
+    has_forward = forward_rows < len(dates)
+    forward_rows = np.clip(forward_rows, 0, len(dates) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        forward_return = price_values[forward_rows] / price_now - 1
+        forward_return[~has_forward] = np.nan
+        benchmark_forward = np.where(has_forward, benchmark_values[forward_rows] / benchmark_values[rows] - 1, np.nan)
+        basket_return = masked_mean(forward_return, passing)
+        universe_return = masked_mean(forward_return, eligible)
+
+    summary = pd.DataFrame({
+        'Trade Date': dates[rows],
+        'Tickers Passing': passing.sum(axis=1),
+        'Basket Return (%)': basket_return * 100,
+        'Universe Return (%)': universe_return * 100,
+        'Benchmark Return (%)': benchmark_forward * 100,
+        'Excess Return (%)': (basket_return - benchmark_forward) * 100,
+    }, index=pd.Index(as_of_dates, name='As Of'))
+    baskets = pd.DataFrame(passing, index=summary.index, columns=tickers)
+    return summary, baskets
+
+
+# Function to average the finite values of each row selected by a mask
+def masked_mean(values, mask):
+    selected = mask & np.isfinite(values)
+    counts = selected.sum(axis=1)
+    totals = np.where(selected, values, 0.0).sum(axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+
+# Function to summarize a backtest across as-of dates
+def summarize_backtest(summary):
+    completed = summary.dropna(subset=['Basket Return (%)', 'Benchmark Return (%)'])
+    if completed.empty:
+        return {'periods': 0}
+    return {
+        'periods': len(completed),
+        'average_tickers': float(completed['Tickers Passing'].mean()),
+        'average_basket_return': float(completed['Basket Return (%)'].mean()),
+        'average_benchmark_return': float(completed['Benchmark Return (%)'].mean()),
+        'average_excess_return': float(completed['Excess Return (%)'].mean()),
+        'hit_rate': float((completed['Excess Return (%)'] > 0).mean() * 100),
+    }
+
+
+# Function to fetch the benchmark close prices covering the price panel
+def fetch_benchmark(prices, symbol='^GSPC'):
+    import yfinance as yf
+
+    start = prices.index[0] - pd.Timedelta(days=7)
+    end = prices.index[-1] + pd.Timedelta(days=1)
+    return yf.Ticker(symbol).history(start=start, end=end)['Close']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the growth screen at past quarter-ends.")
+    parser.add_argument('data_file', help="pre-fetched index data file (e.g. nasdaq_composite_data.json)")
+    parser.add_argument('--growth-type', choices=['QoQ', 'YoY'], default='QoQ')
+    parser.add_argument('--revenue-growth', type=float, default=10)
+    parser.add_argument('--net-income-growth', type=float, default=10)
+    parser.add_argument('--fcf-growth', type=float, default=10)
+    parser.add_argument('--rs-threshold', type=float, default=0)
+    parser.add_argument('--logic', choices=['ALL', 'ANY'], default='ALL')
+    parser.add_argument('--above-sma', type=int, nargs='*', default=[], choices=SMA_LENGTHS)
+    parser.add_argument('--horizon', type=int, default=63, help="forward return horizon in trading days")
+    parser.add_argument('--report-lag', type=int, default=45, help="days after quarter end before results are usable")
+    args = parser.parse_args()
+
+    with open(args.data_file, 'r') as f:
+        data_list = json.load(f)
+
+    fundamentals = build_fundamental_panels(data_list)
+    prices = build_price_panel(data_list)
+    benchmark = fetch_benchmark(prices)
+
+    summary, baskets = run_backtest(
+        fundamentals, prices, benchmark,
+        growth_type=args.growth_type,
+        revenue_growth_threshold=args.revenue_growth,
+        net_income_growth_threshold=args.net_income_growth,
+        fcf_growth_threshold=args.fcf_growth,
+        rs_threshold=args.rs_threshold,
+        filter_logic=args.logic,
+        price_above_sma=args.above_sma,
+        horizon_days=args.horizon,
+        report_lag_days=args.report_lag,
+    )
+    print(summary.round(2).to_string())
+    print(summarize_backtest(summary))
+
+
+if __name__ == "__main__":
+    main()
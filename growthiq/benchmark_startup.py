@@ -0,0 +1,99 @@
+# benchmark_startup.py
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Import statements whose cold-start cost is measured. The last three are the
+# heavy dependencies the app modules load lazily, for comparison.
+IMPORT_TARGETS = {
+    'screening': "import screening",
+    'filter_index': "import filter_index",
+    'plot_data': "import plot_data",
+    'warmup': "import warmup",
+    'dashboard imports': "import streamlit, pandas, filter_index, fundamentals, screening, warmup",
+    'yfinance': "import yfinance",
+    'pandas_ta': "import pandas_ta",
+    'plotly.subplots': "import plotly.subplots",
+}
+
+COLD_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+FIRST_RENDER_SNIPPET = """
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file("growth_dashboard.py", default_timeout={timeout})
+app.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+rerun = time.perf_counter() - start
+print(first, rerun)
+"""
+
+
+# Function to run a snippet in a fresh interpreter and return its stdout
+def run_fresh(snippet):
+    result = subprocess.run(
+        [sys.executable, '-c', snippet], cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+# Function to measure the cold-import time of a statement, in seconds
+def measure_cold_import(statement, repeat):
+    samples = [float(run_fresh(COLD_IMPORT_SNIPPET.format(statement=statement))) for _ in range(repeat)]
+    return statistics.median(samples)
+
+
+# Function to measure first-render and rerun latency of the dashboard, in seconds
+def measure_first_render(repeat, timeout):
+    firsts, reruns = [], []
+    for _ in range(repeat):
+        first, rerun = run_fresh(FIRST_RENDER_SNIPPET.format(timeout=timeout)).split()
+        firsts.append(float(first))
+        reruns.append(float(rerun))
+    return statistics.median(firsts), statistics.median(reruns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-import and first-render latency of the dashboard.")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per measurement (median is reported)")
+    parser.add_argument('--timeout', type=float, default=60, help="AppTest script timeout in seconds")
+    parser.add_argument('--skip-render', action='store_true', help="only measure cold imports")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = {'cold_import_seconds': {}}
+    for target, statement in IMPORT_TARGETS.items():
+        try:
+            seconds = measure_cold_import(statement, args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"{target:<24} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        results['cold_import_seconds'][target] = seconds
+        print(f"{target:<24} cold import {seconds * 1000:8.1f} ms")
+
+    if not args.skip_render:
+        first, rerun = measure_first_render(args.repeat, args.timeout)
+        results['first_render_seconds'] = first
+        results['rerun_seconds'] = rerun
+        print(f"{'growth_dashboard.py':<24} first render {first * 1000:7.1f} ms, rerun {rerun * 1000:7.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# blocks.py
+import gzip
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# zstd needs the optional zstandard package on every reader, so blocks are
+# gzip unless zstd is asked for explicitly (GROWTHIQ_BLOCK_CODEC=zstd)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_CODEC = os.environ.get('GROWTHIQ_BLOCK_CODEC', 'gzip')
+
+# Ranges closer than this many bytes are fetched with a single request
+RANGE_MERGE_GAP = 64 * 1024
+
+
+def compress(payload, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(payload)
+    return gzip.compress(payload, compresslevel=6)
+
+
+def decompress(payload, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed blocks")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return gzip.decompress(payload)
+
+
+# Function to derive the block blob and offset index URLs (or paths) of an index data file
+def block_locations(data_location):
+    base = data_location[:-len('.json')] if data_location.endswith('.json') else data_location
+    return f"{base}.blocks", f"{base}.index.json"
+
+
+# Function to write one independently compressed block per ticker into a single
+# blob, plus a small index mapping each ticker to its (offset, length)
+def write_block_file(data_list, data_file, codec=DEFAULT_CODEC):
+    blob_file, index_file = block_locations(data_file)
+    offsets = {}
+    offset = 0
+    with open(blob_file, 'wb') as f:
+        for data in data_list:
+            block = compress(json.dumps(data).encode('utf-8'), codec)
+            f.write(block)
+            offsets[data['Ticker']] = [offset, len(block)]
+            offset += len(block)
+
+    with open(index_file, 'w') as f:
+        json.dump({'codec': codec, 'blob': os.path.basename(blob_file), 'size': offset, 'tickers': offsets}, f)
+    logging.info(f"Wrote {len(offsets)} {codec} blocks ({offset} bytes) to '{blob_file}' and index '{index_file}'")
+    return blob_file, index_file
+
+
+# Function to group ticker blocks into as few byte ranges as possible
+def plan_ranges(block_index, tickers, merge_gap=RANGE_MERGE_GAP):
+    blocks = sorted(
+        (block_index['tickers'][ticker][0], block_index['tickers'][ticker][1], ticker)
+        for ticker in dict.fromkeys(tickers) if ticker in block_index['tickers']
+    )
+    ranges = []
+    for offset, length, ticker in blocks:
+        if ranges and offset - ranges[-1]['end'] <= merge_gap:
+            ranges[-1]['end'] = max(ranges[-1]['end'], offset + length)
+            ranges[-1]['blocks'].append((offset, length, ticker))
+        else:
+            ranges.append({'start': offset, 'end': offset + length, 'blocks': [(offset, length, ticker)]})
+    return ranges
+
+
+# Function to fetch one byte range and split it into decoded ticker records
+def fetch_range(session, blob_url, byte_range, codec):
+    start, end = byte_range['start'], byte_range['end']
+    response = session.get(blob_url, headers={'Range': f"bytes={start}-{end - 1}"}, timeout=60)
+    response.raise_for_status()
+    body = response.content
+    if response.status_code != 206:
+        # The server ignored the Range header and sent the whole blob
+        body = body[start:end]
+
+    records = {}
+    for offset, length, ticker in byte_range['blocks']:
+        block = body[offset - start:offset - start + length]
+        records[ticker] = json.loads(decompress(block, codec))
+    return records, len(response.content)
+
+
+# Function to fetch only the requested tickers of a block blob, with concurrent
+# HTTP Range requests; returns the records in the order of `tickers`
+def fetch_ticker_blocks(blob_url, block_index, tickers, max_workers=8, session=None):
+    import requests
+
+    session = session or requests.Session()
+    ranges = plan_ranges(block_index, tickers)
+    codec = block_index['codec']
+
+    records = {}
+    transferred = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ranges)))) as pool:
+        for range_records, size in pool.map(lambda byte_range: fetch_range(session, blob_url, byte_range, codec), ranges):
+            records.update(range_records)
+            transferred += size
+
+    logging.info(
+        f"Fetched {len(records)} ticker blocks in {len(ranges)} range requests "
+        f"({transferred} of {block_index.get('size', '?')} bytes)"
+    )
+    return [records[ticker] for ticker in dict.fromkeys(tickers) if ticker in records]
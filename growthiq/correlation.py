@@ -0,0 +1,221 @@
+# correlation.py
+import numpy as np
+import pandas as pd
+
+from backtest import to_trading_days
+
+# Fewest common trading days for a correlation or beta to be reported
+MIN_OBSERVATIONS = 20
+
+# Rows of the correlation matrix computed per block, to bound peak memory
+CORRELATION_BLOCK_SIZE = 512
+
+# Largest basket drawn as a correlation heatmap (bigger ones only get the tables)
+HEATMAP_MAX_TICKERS = 300
+
+
+# Function to turn a day x ticker close panel into daily returns, aligned with the
+# benchmark on the days both traded (as calculate_relative_strength_from_data does)
+def aligned_returns(prices, benchmark):
+    benchmark = pd.Series(benchmark.to_numpy(dtype=float), index=to_trading_days(benchmark.index.to_series()).to_numpy())
+    benchmark = benchmark.groupby(level=0).last()
+    days = prices.index.intersection(benchmark.index)
+    prices = prices.loc[days]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = prices.to_numpy(dtype=float)[1:] / prices.to_numpy(dtype=float)[:-1] - 1
+        benchmark_returns = benchmark.loc[days].to_numpy(dtype=float)[1:] / benchmark.loc[days].to_numpy(dtype=float)[:-1] - 1
+    returns[~np.isfinite(returns)] = np.nan
+    benchmark_returns[~np.isfinite(benchmark_returns)] = np.nan
+    return pd.DataFrame(returns, index=days[1:], columns=prices.columns), pd.Series(benchmark_returns, index=days[1:])
+
+
+# Function to compute the pairwise-complete Pearson correlation matrix of the
+# return columns. Each pair uses the days both tickers have a return; sums are
+# formed with matrix products over row blocks, in float32 to halve memory and
+# time for large baskets.
+def correlation_matrix(returns, block_size=CORRELATION_BLOCK_SIZE, dtype=np.float32, min_observations=MIN_OBSERVATIONS):
+    values = np.asarray(returns, dtype=np.float64)
+    valid = np.isfinite(values)
+
+    # Centre each column on its own mean first, so float32 sums stay accurate
+    means = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+    centred = np.where(valid, values - means, 0.0).astype(dtype)
+    mask = valid.astype(dtype)
+    squares = centred * centred
+
+    n_tickers = values.shape[1]
+    corr = np.empty((n_tickers, n_tickers), dtype=dtype)
+    for start in range(0, n_tickers, block_size):
+        block = slice(start, start + block_size)
+        # For rows i in the block and all columns j, over days both traded:
+        count = mask[:, block].T @ mask             # n_ij
+        sum_i = centred[:, block].T @ mask          # sum of x_i
+        sum_j = mask[:, block].T @ centred          # sum of x_j
+        sum_ij = centred[:, block].T @ centred      # sum of x_i * x_j
+        sum_ii = squares[:, block].T @ mask         # sum of x_i^2
+        sum_jj = mask[:, block].T @ squares         # sum of x_j^2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = sum_ij - sum_i * sum_j / count
+            variance_i = sum_ii - sum_i * sum_i / count
+            variance_j = sum_jj - sum_j * sum_j / count
+            block_corr = covariance / np.sqrt(variance_i * variance_j)
+        block_corr[(count < min_observations) | ~np.isfinite(block_corr)] = np.nan
+        corr[block] = np.clip(block_corr, -1, 1)
+
+    np.fill_diagonal(corr, np.where(valid.sum(axis=0) >= min_observations, 1.0, np.nan))
+    return corr
+
+
+# Function to compute rolling betas of every ticker against the benchmark over
+# `window` trading days, using cumulative sums over the days both have a return
+def rolling_betas(returns, benchmark_returns, window=63, min_observations=MIN_OBSERVATIONS):
+    values = np.asarray(returns, dtype=np.float64)
+    market = np.asarray(benchmark_returns, dtype=np.float64)[:, None]
+    valid = np.isfinite(values) & np.isfinite(market)
+    x = np.where(valid, market, 0.0)
+    y = np.where(valid, values, 0.0)
+
+    def rolling_sum(array):
+        csum = np.vstack([np.zeros((1, array.shape[1])), np.cumsum(array, axis=0)])
+        start = np.clip(np.arange(1, len(array) + 1) - window, 0, None)
+        return csum[1:] - csum[start]
+
+    count = rolling_sum(valid.astype(float))
+    sum_x, sum_y = rolling_sum(x), rolling_sum(y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = rolling_sum(x * y) - sum_x * sum_y / count
+        variance = rolling_sum(x * x) - sum_x * sum_x / count
+        betas = covariance / variance
+    betas[(count < min_observations) | ~np.isfinite(betas)] = np.nan
+    return pd.DataFrame(betas, index=getattr(returns, 'index', None), columns=getattr(returns, 'columns', None))
+
+
+# Function to cluster tickers by average linkage on the correlation distance
+# sqrt(2 * (1 - corr)), with the nearest-neighbour-chain algorithm (O(n^2)).
+# Pairs without a correlation are treated as uncorrelated. Returns the merges
+# as rows (ticker a, ticker b, distance, size) sorted by distance, where a and
+# b are representative column positions of the two merged clusters.
+def average_linkage(corr):
+    n_tickers = len(corr)
+    distance = np.sqrt(np.clip(2 * (1 - np.nan_to_num(np.asarray(corr, dtype=np.float64), nan=0.0)), 0, None))
+    np.fill_diagonal(distance, np.inf)
+    sizes = np.ones(n_tickers)
+    active = np.ones(n_tickers, dtype=bool)
+    merges = []
+    chain = []
+    while len(merges) < n_tickers - 1:
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        current = chain[-1]
+        row = np.where(active, distance[current], np.inf)
+        row[current] = np.inf
+        nearest = int(np.argmin(row))
+        # Prefer the previous chain element on ties so the chain terminates
+        if len(chain) > 1 and row[chain[-2]] <= row[nearest]:
+            nearest = chain[-2]
+        if len(chain) > 1 and nearest == chain[-2]:
+            # Reciprocal nearest neighbours: merge them into `nearest`
+            chain.pop()
+            chain.pop()
+            height = distance[current, nearest]
+            size = sizes[current] + sizes[nearest]
+            merged = (sizes[current] * distance[current] + sizes[nearest] * distance[nearest]) / size
+            distance[nearest] = merged
+            distance[:, nearest] = merged
+            distance[nearest, nearest] = np.inf
+            distance[current] = np.inf
+            distance[:, current] = np.inf
+            active[current] = False
+            sizes[nearest] = size
+            merges.append((nearest, current, height, size))
+        else:
+            chain.append(nearest)
+
+    merges = np.array(merges, dtype=float).reshape(-1, 4)
+    return merges[np.argsort(merges[:, 2], kind='stable')]
+
+
+# Function to cut the clustering into `n_clusters` flat clusters by applying all
+# but the last n_clusters - 1 merges; labels are numbered by cluster size
+def cut_clusters(merges, n_tickers, n_clusters):
+    parent = np.arange(n_tickers)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b, _, _ in merges[:max(n_tickers - n_clusters, 0)]:
+        parent[find(int(b))] = find(int(a))
+    roots = np.array([find(i) for i in range(n_tickers)])
+    _, labels, counts = np.unique(roots, return_inverse=True, return_counts=True)
+    rank = np.empty_like(counts)
+    rank[np.argsort(-counts, kind='stable')] = np.arange(len(counts))
+    return rank[labels] + 1
+
+
+# Function to summarize each cluster: size, average correlation between its
+# members, and its largest sector with that sector's share of the cluster
+def summarize_clusters(corr, labels, sectors):
+    rows = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        block = corr[np.ix_(members, members)]
+        off_diagonal = block[~np.eye(len(members), dtype=bool) & np.isfinite(block)]
+        sector_counts = pd.Series(np.asarray(sectors)[members]).value_counts()
+        rows.append({
+            'Cluster': int(label),
+            'Tickers': len(members),
+            'Avg Correlation': float(off_diagonal.mean()) if off_diagonal.size else np.nan,
+            'Top Sector': sector_counts.index[0] if not sector_counts.empty else None,
+            'Top Sector Share': float(sector_counts.iloc[0] / len(members)) if not sector_counts.empty else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+
+# Function to compute the correlation, beta and linkage analytics of a basket
+# from its pre-fetched records. This is the expensive part; cut it into flat
+# clusters with cluster_basket().
+def basket_analytics(data_list, benchmark, beta_window=63):
+    from backtest import build_price_panel
+
+    prices = build_price_panel(data_list).sort_index()
+    returns, benchmark_returns = aligned_returns(prices, benchmark)
+    tickers = list(returns.columns)
+    corr = correlation_matrix(returns.to_numpy())
+    betas = rolling_betas(returns, benchmark_returns, beta_window)
+    return {
+        'corr': pd.DataFrame(corr, index=tickers, columns=tickers),
+        'merges': average_linkage(corr) if tickers else np.empty((0, 4)),
+        'betas': betas,
+        'sectors': [(data.get('Info') or {}).get('sector', 'Unknown') for data in data_list],
+    }
+
+
+# Function to cut basket analytics into `n_clusters` clusters. Returns the
+# per-ticker table (sector, cluster, latest beta, average correlation with the
+# rest of the basket), the cluster summary and the basket's average pairwise
+# correlation.
+def cluster_basket(analytics, n_clusters=5):
+    corr = analytics['corr'].to_numpy()
+    tickers = list(analytics['corr'].index)
+    sectors = analytics['sectors']
+    labels = cut_clusters(analytics['merges'], len(tickers), max(1, min(n_clusters, len(tickers))))
+
+    # Average correlation of each ticker with the rest of the basket
+    off_diagonal_mask = ~np.eye(len(tickers), dtype=bool) & np.isfinite(corr)
+    off_diagonal = corr[off_diagonal_mask]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_corr = np.where(off_diagonal_mask, corr, 0).sum(axis=1) / off_diagonal_mask.sum(axis=1)
+
+    betas = analytics['betas']
+    table = pd.DataFrame({
+        'Ticker': tickers,
+        'Sector': sectors,
+        'Cluster': labels,
+        'Beta': betas.iloc[-1].to_numpy() if len(betas) else np.nan,
+        'Avg Correlation': average_corr,
+    }).sort_values(['Cluster', 'Avg Correlation'], ascending=[True, False]).reset_index(drop=True)
+    average_correlation = float(off_diagonal.mean()) if off_diagonal.size else np.nan
+    return table, summarize_clusters(corr, labels, sectors), average_correlation
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+# Boolean columns of the screened result that get a precomputed bitset
+FLAG_COLUMNS = ['Price Above SMA 20', 'Price Above SMA 50', 'Price Above SMA 200']
+
+# RSI bands offered as filters: band name -> (lower, upper), both exclusive
+RSI_BANDS = {
+    'Overbought': (70, np.inf),
+    'Oversold': (-np.inf, 30),
+}
+
+
+# Function to pack a boolean mask into a bitset (8 rows per byte)
+def pack_mask(mask):
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+# Bitmap index over a screened result. It is built once per screening run;
+# afterwards any combination of sidebar filters is evaluated with bitwise
+# AND/OR over the packed arrays instead of rebuilding boolean Series.
+class FilterIndex:
+    def __init__(self, df):
+        self.size = len(df)
+        self.all_rows = pack_mask(np.ones(self.size, dtype=bool))
+        self.no_rows = pack_mask(np.zeros(self.size, dtype=bool))
+
+        # One bitset per boolean flag (missing values never match)
+        self.flags = {}
+        for column in FLAG_COLUMNS:
+            if column in df:
+                self.flags[column] = pack_mask(df[column].to_numpy() == True)
+
+        # One bitset per sector
+        self.sectors = {}
+        if 'Sector' in df:
+            codes, uniques = pd.factorize(df['Sector'])
+            for code, sector in enumerate(uniques):
+                self.sectors[sector] = pack_mask(codes == code)
+
+        # One bitset per RSI band (rows without RSI never match)
+        if 'RSI' in df:
+            rsi = pd.to_numeric(df['RSI'], errors='coerce').to_numpy(dtype=float)
+        else:
+            rsi = np.full(self.size, np.nan)
+        self.rsi_bands = {
+            band: pack_mask((rsi > lower) & (rsi < upper))
+            for band, (lower, upper) in RSI_BANDS.items()
+        }
+
+    # Return the sorted sector names available for filtering
+    def sector_names(self):
+        return sorted(sector for sector in self.sectors if isinstance(sector, str))
+
+    # Function to evaluate a filter combination and return matching row positions
+    def evaluate(self, flags=(), rsi_bands=(), sector='All', logic='ALL'):
+        bitsets = [self.flags.get(flag, self.no_rows) for flag in flags]
+        bitsets += [self.rsi_bands[band] for band in rsi_bands]
+        if sector is not None and sector != 'All':
+            bitsets.append(self.sectors.get(sector, self.no_rows))
+
+        # Same semantics as the Series-based filters: ALL starts from every
+        # row and intersects, ANY starts from no row and unions
+        if logic == 'ALL':
+            combined = np.bitwise_and.reduce([self.all_rows] + bitsets)
+        else:
+            combined = np.bitwise_or.reduce([self.no_rows] + bitsets)
+
+        return np.flatnonzero(np.unpackbits(combined, count=self.size))
+
+    # Function to filter the DataFrame the index was built from
+    def apply(self, df, flags=(), rsi_bands=(), sector='All', logic='ALL'):
+        return df.iloc[self.evaluate(flags, rsi_bands, sector, logic)]
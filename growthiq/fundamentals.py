@@ -0,0 +1,124 @@
+# fundamentals.py
+import numpy as np
+import pandas as pd
+
+from backtest import FUNDAMENTAL_FIELDS, build_fundamental_panels, last_valid_rows, take_rows
+
+# Compound annual growth horizons offered by the screen: label -> quarters
+CAGR_HORIZONS = {'1Y': 4, '2Y': 8, '3Y': 12}
+
+# Quarters compared by each growth type
+GROWTH_PERIODS = {'QoQ': 1, 'YoY': 4}
+
+TTM_QUARTERS = 4
+
+
+# Function to get the CAGR horizons for which a metrics table has any value. A
+# horizon of n quarters needs n + 1 quarters of statements, which yfinance's
+# quarterly statements (about five quarters) only have for 1Y.
+def available_cagr_horizons(df):
+    return [
+        label for label in CAGR_HORIZONS
+        if any(df[column].notna().any() for column in df.columns if column.endswith(f' CAGR {label}'))
+    ]
+
+
+# Function to shift a quarter x ticker panel down by `periods` rows, padding with NaN
+def shift_rows(values, periods):
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+# Function to compute trailing-twelve-month sums. A sum needs all four quarters,
+# so a missing quarter makes the four TTM values that include it NaN.
+def ttm_sum(values, quarters=TTM_QUARTERS):
+    valid = np.isfinite(values)
+    csum = np.vstack([np.zeros(values.shape[1]), np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    ccount = np.vstack([np.zeros(values.shape[1]), np.cumsum(valid, axis=0)])
+    ttm = np.full_like(values, np.nan)
+    if len(values) >= quarters:
+        window_count = ccount[quarters:] - ccount[:-quarters]
+        ttm[quarters - 1:] = np.where(window_count == quarters, csum[quarters:] - csum[:-quarters], np.nan)
+    return ttm
+
+
+# Function to compute growth (%) against `periods` quarters back. Growth off a
+# zero or negative base has no meaning, so it is NaN, as is growth across a
+# missing quarter.
+def positive_base_growth(values, periods):
+    base = shift_rows(values, periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(base > 0, (values / base - 1) * 100, np.nan)
+    growth[~np.isfinite(growth)] = np.nan
+    return growth
+
+
+# Function to compute the compound annual growth rate (%) over `quarters`
+# quarters; both ends must be positive
+def cagr(values, quarters):
+    base = shift_rows(values, quarters)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where((base > 0) & (values > 0), ((values / base) ** (4 / quarters) - 1) * 100, np.nan)
+    rate[~np.isfinite(rate)] = np.nan
+    return rate
+
+
+# Function to count, per quarter, the consecutive quarters up to it in which the
+# value rose against `periods` quarters back. A fall, a flat quarter or a
+# missing comparison ends the streak; unlike growth rates this also works for
+# negative values (a smaller loss counts as an increase).
+def growth_streak(values, periods):
+    base = shift_rows(values, periods)
+    rising = np.isfinite(values) & np.isfinite(base) & (values > base)
+    rows = np.arange(len(values))[:, None]
+    last_break = np.maximum.accumulate(np.where(rising, -1, rows), axis=0)
+    return (rows - last_break).astype(float)
+
+
+# Function to compute the trend metrics of every ticker at once, as of each
+# ticker's latest reported quarter. Returns a DataFrame indexed by ticker with,
+# per fundamental: TTM sum, CAGR per horizon, acceleration (change in growth
+# in percentage points since the previous quarter) and growth streak.
+def compute_fundamental_metrics(panels, growth_type='QoQ'):
+    periods = GROWTH_PERIODS[growth_type]
+    metrics = {}
+    tickers = None
+    for name, panel in panels.items():
+        tickers = panel.columns if tickers is None else tickers
+        if panel.empty:
+            continue
+        values = panel.to_numpy(dtype=float)
+        latest = last_valid_rows(values)[-1]
+
+        growth = positive_base_growth(values, periods)
+        metrics[f'{name} TTM'] = take_rows(ttm_sum(values), latest)
+        for label, quarters in CAGR_HORIZONS.items():
+            metrics[f'{name} CAGR {label}'] = take_rows(cagr(values, quarters), latest)
+        metrics[f'{name} Acceleration'] = take_rows(growth - shift_rows(growth, 1), latest)
+        metrics[f'{name} Growth Streak'] = take_rows(growth_streak(values, periods), latest)
+    return pd.DataFrame(metrics, index=pd.Index(tickers if tickers is not None else [], name='Ticker'))
+
+
+# Function to compute the trend metrics straight from pre-fetched index records
+def compute_trend_metrics(data_list, growth_type='QoQ'):
+    return compute_fundamental_metrics(build_fundamental_panels(data_list), growth_type)
+
+
+# Function to build the conditions of the trend criteria that are switched on.
+# criteria: {'metric', 'ttm_min', 'cagr_horizon', 'cagr_min', 'streak_min', 'accelerating'}
+def trend_conditions(df, criteria):
+    if not criteria or criteria.get('metric') not in FUNDAMENTAL_FIELDS:
+        return []
+    metric = criteria['metric']
+    conditions = []
+    if criteria.get('ttm_min'):
+        conditions.append(df[f'{metric} TTM'] >= criteria['ttm_min'])
+    if criteria.get('cagr_min') is not None:
+        conditions.append(df[f"{metric} CAGR {criteria.get('cagr_horizon', '1Y')}"] >= criteria['cagr_min'])
+    if criteria.get('streak_min'):
+        conditions.append(df[f'{metric} Growth Streak'] >= criteria['streak_min'])
+    if criteria.get('accelerating'):
+        conditions.append(df[f'{metric} Acceleration'] > 0)
+    return conditions
@@ -1,12 +1,11 @@
-import requests
 import logging
-import os
-import json
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import pandas_ta as ta
-from plot_data import plot_fundamentals, plot_technical_chart
+from filter_index import FilterIndex
+from rank_index import COMPOSITE, RANK_METRICS
+from result_store import ResultStore
+from screening import get_tickers, get_data_version, get_cagr_horizons, fetch_and_process_data, fetch_and_rank_data, run_index_backtest, compute_basket_analytics
+from warmup import start_warmup
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +13,9 @@ logging.basicConfig(level=logging.INFO)
 # Set page configuration
 st.set_page_config(layout="wide")
 
+# Warm the index caches in the background (no-op if the server already started it)
+warmup_state = start_warmup()
+
 # Sidebar for Screening Criteria
 st.sidebar.header("Screening Criteria")
 
@@ -24,91 +26,101 @@ selected_market = st.sidebar.selectbox("Select Market Index", market_indices)
 # Growth Type
 growth_type = st.sidebar.selectbox("Select Growth Type", ['QoQ', 'YoY'])
 
+# Screening mode: absolute thresholds, or the best-ranked tickers by one metric
+# (or a weighted composite of their percentile ranks), across the index or
+# within each sector. Rank modes replace the thresholds and trend criteria, whose
+# widgets are disabled and left out of the result-store key.
+screening_mode = st.sidebar.selectbox("Screening Mode", ['Thresholds', 'Top K', 'Top Percentile'])
+rank_mode = screening_mode != 'Thresholds'
+rank_criteria = None
+if rank_mode:
+    rank_metric = st.sidebar.selectbox("Rank By", [COMPOSITE] + RANK_METRICS)
+    if screening_mode == 'Top K':
+        rank_value = st.sidebar.number_input("Top K Tickers", min_value=1, max_value=1000, value=25, step=5)
+    else:
+        rank_value = st.sidebar.slider("Top Percent of Tickers (%)", 1, 50, 10)
+    rank_scope = st.sidebar.selectbox("Rank Within", ['Whole Index', 'Each Sector'])
+    rank_weights = None
+    if rank_metric == COMPOSITE:
+        rank_weights = {metric: st.sidebar.slider(f"{metric} Weight", 0.0, 5.0, 1.0, 0.5) for metric in RANK_METRICS}
+    rank_criteria = {
+        'mode': screening_mode,
+        'metric': rank_metric,
+        'value': rank_value,
+        'by_sector': rank_scope == 'Each Sector',
+        'weights': rank_weights,
+    }
+    st.sidebar.caption("Growth thresholds and trend criteria apply in Thresholds mode only.")
+
 # Growth Thresholds for Metrics
 st.sidebar.subheader("Set Growth Thresholds (%) for Metrics")
-revenue_growth_threshold = st.sidebar.number_input("Revenue Growth Threshold (%)", min_value=0, max_value=100, value=10, step=5)
-net_income_growth_threshold = st.sidebar.number_input("Net Income Growth Threshold (%)", min_value=0, max_value=100, value=10, step=5)
-fcf_growth_threshold = st.sidebar.number_input("Free Cash Flow Growth (%)", min_value=0, max_value=100, value=10, step=5)
+revenue_growth_threshold = st.sidebar.number_input("Revenue Growth Threshold (%)", min_value=0, max_value=100, value=10, step=5, disabled=rank_mode)
+net_income_growth_threshold = st.sidebar.number_input("Net Income Growth Threshold (%)", min_value=0, max_value=100, value=10, step=5, disabled=rank_mode)
+fcf_growth_threshold = st.sidebar.number_input("Free Cash Flow Growth (%)", min_value=0, max_value=100, value=10, step=5, disabled=rank_mode)
 
 # Relative Strength Threshold
-rs_threshold = st.sidebar.slider("Relative Strength Threshold (%)", -50, 50, 0)
+rs_threshold = st.sidebar.slider("Relative Strength Threshold (%)", -50, 50, 0, disabled=rank_mode)
 
 # Logic Selection: AND or OR
-filter_logic = st.sidebar.selectbox("Screening Logic", ['ALL', 'ANY'])
+filter_logic = st.sidebar.selectbox("Screening Logic", ['ALL', 'ANY'], disabled=rank_mode)
+
+# Fundamental trend criteria: TTM size, multi-year CAGR, growth acceleration and
+# streaks of consecutive growing quarters (each one is off at its default)
+st.sidebar.subheader("Fundamental Trend Criteria")
+trend_metric = st.sidebar.selectbox("Trend Metric", ['Revenue', 'Net Income', 'Free Cash Flow'], disabled=rank_mode)
+ttm_min = st.sidebar.number_input("Min TTM Value ($M, 0 = off)", min_value=0, value=0, step=100, disabled=rank_mode)
+# Only offer the CAGR horizons the index's quarterly statements are long enough
+# for; they are known once a screen of the index has loaded its metrics, so the
+# first render needs no download
+cagr_horizons = st.session_state.get('cagr_horizons', {}).get(selected_market)
+if cagr_horizons:
+    cagr_horizon = st.sidebar.selectbox("CAGR Horizon", cagr_horizons, disabled=rank_mode)
+    cagr_min = st.sidebar.number_input("Min CAGR (%, empty = off)", min_value=-100, max_value=1000, value=None, step=5, disabled=rank_mode)
+else:
+    cagr_horizon, cagr_min = None, None
+    if cagr_horizons is None:
+        st.sidebar.caption("CAGR criteria appear after the first screen of this index.")
+    else:
+        st.sidebar.caption("Not enough quarterly history for a CAGR screen.")
+streak_min = st.sidebar.number_input("Min Quarters of Consecutive Growth (0 = off)", min_value=0, max_value=12, value=0, disabled=rank_mode)
+accelerating = st.sidebar.checkbox("Require Growth Acceleration", disabled=rank_mode)
+trend_criteria = {
+    'metric': trend_metric,
+    'ttm_min': ttm_min * 1e6,
+    'cagr_horizon': cagr_horizon,
+    'cagr_min': cagr_min,
+    'streak_min': streak_min,
+    'accelerating': accelerating,
+}
+trend_criteria_on = bool(ttm_min or cagr_min is not None or streak_min or accelerating)
+
+# Optional custom ticker list, screened within the selected index
+custom_tickers = st.sidebar.text_input("Custom Tickers (optional, comma separated)", "")
+custom_tickers = [ticker.strip().upper() for ticker in custom_tickers.split(',') if ticker.strip()]
 
 # Button to run the screening
 run_screening = st.sidebar.button("RUN SCREENING")
 
-# Map index name to corresponding pre-fetched data file
-index_file_map = {
-    "S&P500 Index": "https://stocktickerdata.blob.core.windows.net/stocktickerdata/s&p500_index_data.json",
-    "NASDAQ Composite": "https://stocktickerdata.blob.core.windows.net/stocktickerdata/nasdaq_composite_data.json",
-    "Dow Jones Industrial Index": "https://stocktickerdata.blob.core.windows.net/stocktickerdata/dow_jones_industrial_index_data.json"
-}
-
-
-# Function to fetch JSON data from a URL (Azure Blob URL)
-@st.cache_data(show_spinner=True)
-def fetch_data_from_azure_blob(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Check if the request was successful (status code 200)
-        return response.json()  # Parse the JSON response
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching data: {e}")
-        return None
-
-# Function to get tickers for the selected market index
-def get_tickers(market_index):
-    if market_index == 'S&P500 Index':
-        comp_list = pd.read_html('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies')[0]['Symbol'].tolist()
-        print(comp_list)
-        return comp_list
-    elif market_index == 'Dow Jones Industrial Index':
-        comp_list = pd.read_html('https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average')[1]['Symbol'].tolist()
-        print("Dow Jones Industrial Companies")
-        print(comp_list)
-        return comp_list
-    elif market_index == 'NASDAQ Composite':
-        # For NASDAQ Composite, we'll use a sample due to the large number of tickers
-        comp_list = pd.read_csv("./growthiq/nasdaq_components.csv")['Symbol'].to_list()
-        print(comp_list)
-        return comp_list
-    else:
-        return []
-
-# Function to calculate QoQ and YoY growth
-def calculate_growth(series):
-    series = series.sort_index()
-    qoQ_growth = series.pct_change(periods=1) * 100  # Quarter over Quarter
-    yoY_growth = series.pct_change(periods=4) * 100  # Year over Year
-    return qoQ_growth, yoY_growth
-
-# Function to calculate relative strength from data
-def calculate_relative_strength_from_data(historical_data, benchmark_data=None):
-    # If benchmark data is not provided, fetch S&P 500 data
-    if benchmark_data is None:
-        benchmark = yf.Ticker('^GSPC')
-        benchmark_data = benchmark.history(period='1y')
-        benchmark_data = pd.Series(benchmark_data['Close'])
-    
-    stock_data = pd.Series(historical_data['Close'])
-    
-    # Align dates
-    stock_data, benchmark_data = stock_data.align(benchmark_data, join='inner', axis=0)
-    # Calculate cumulative returns
-    stock_return = (stock_data.iloc[-1] / stock_data.iloc[0]) - 1
-    benchmark_return = (benchmark_data.iloc[-1] / benchmark_data.iloc[0]) - 1
-    # Calculate relative strength
-    relative_strength = (stock_return - benchmark_return) * 100  # In percentage
-    return relative_strength
+# Report the warm-up readiness of the index caches
+warmup_status = warmup_state.snapshot()
+ready_indices = [name for name, entry in warmup_status['indices'].items() if entry['status'] == 'ready']
+if warmup_status['ready']:
+    st.sidebar.caption(f"Index data ready (warm-up took {warmup_status['duration_seconds']}s)")
+elif warmup_status['failed']:
+    st.sidebar.caption(f"Warm-up failed for {', '.join(warmup_status['failed'])}; it will load on first use")
+else:
+    st.sidebar.caption(f"Warming index data: {len(ready_indices)}/{len(warmup_status['indices'])} ready")
 
 # Fetch data for the selected ticker and time period
 @st.cache_data(show_spinner=True)
 def fetch_and_plot_data(ticker, period):
-    stock = yf.Ticker(ticker)
-    print(stock)
-    historical_data = stock.history(period=period)
+    # Heavy modules are only needed once a ticker is charted
+    import pandas_ta as ta
+    from plot_data import plot_fundamentals, plot_technical_chart
+    from providers import get_provider
+
+    provider = get_provider()
+    historical_data = provider.history(ticker, period)
     if historical_data.empty:
         return None, None
     # Calculate technical indicators
@@ -121,8 +133,9 @@ def fetch_and_plot_data(ticker, period):
     historical_data['MACD_Hist'] = macd['MACDh_12_26_9']
 
     # Fetch historical fundamental data (quarterly)
-    financials = stock.quarterly_financials
-    cashflow = stock.quarterly_cashflow
+    statements = provider.quarterly_statements(ticker)
+    financials = statements['Financials']
+    cashflow = statements['Cashflow']
 
     # Transpose and format financials data
     financials = financials.T
@@ -155,230 +168,90 @@ def fetch_and_plot_data(ticker, period):
     else:
         st.warning("Data not available for this ticker.")
 
-# Function to fetch and process pre-fetched data
-@st.cache_data(show_spinner=True)
-def fetch_and_process_data(
-    tickers,
-    growth_type,
-    revenue_growth_threshold,
-    net_income_growth_threshold,
-    fcf_growth_threshold,
-    rs_threshold,
-    filter_logic,
-    index_name="S&P500 Index"  # You can choose between S&P500, NASDAQ, or Dow Jones
-):
-    # Get the appropriate file for the selected index
-    data_file_url = index_file_map.get(index_name)
-
-    if not data_file_url:
-        st.error(f"No pre-fetched data file found for {index_name}.")
-        return pd.DataFrame()
-
-    # Fetch data from the URL
-    data_list = fetch_data_from_azure_blob(data_file_url)
-
-    # Convert JSON to DataFrame
-    if data_list:
-        df = pd.DataFrame(data_list)
-    else:
-        st.error("No data available after fetching.")
-        return pd.DataFrame()
-
-    # Filter the data for the selected tickers
-    results = []
-    for data in data_list:
-        if data['Ticker'] not in tickers:
-            continue
-        else:
-            ticker = data['Ticker']
-            company_name = data['Info'].get('longName', data['Ticker'])
-            
-            # Convert financial data back to DataFrames
-            try:
-                financials = pd.DataFrame(data['Financials'])[['Total Revenue', 'Net Income']].dropna()
-            except Exception as e:
-                logging.warning(f"Ticker {ticker} for {company_name} error")
-                logging.warning(f"financial data Total Revenue or Net Income is not available")
-                continue
-            try:
-                cashflow = pd.DataFrame(data['Cashflow'])[['Free Cash Flow']].dropna()
-            except Exception as e:
-                logging.warning(f"Ticker {ticker} for {company_name} error")
-                logging.warning("financial data Cashflow is not available")
-                continue
-                
-            # Convert index to datetime
-            financials.index = pd.to_datetime(financials.index, errors='coerce')
-            cashflow.index = pd.to_datetime(cashflow.index, errors='coerce')
-
-            # Drop rows with NaT in index
-            financials.dropna(inplace=True)
-            cashflow.dropna(inplace=True)
-
-            # Extract required metrics
-            revenue = financials['Total Revenue']
-            net_income = financials['Net Income']
-            free_cash_flow = cashflow['Free Cash Flow']
-
-            # Skip companies with negative or zero revenue and net income
-            if revenue.iloc[-1] <= 0 or net_income.iloc[-1] <= 0:
-                logging.warning(f"Ticker {ticker} for {company_name} has non-positive revenue or net income. Skipping.")
-                continue
-
-            # Calculate growth rates (QoQ or YoY)
-            revenue_qoq, revenue_yoy = calculate_growth(revenue)
-            net_income_qoq, net_income_yoy = calculate_growth(net_income)
-            fcf_qoq, fcf_yoy = calculate_growth(free_cash_flow)
-           # Select the growth rate based on growth type
-            if growth_type == 'QoQ':
-                revenue_growth = revenue_qoq
-                net_income_growth = net_income_qoq
-                fcf_growth = fcf_qoq
-            else:
-                revenue_growth = revenue_yoy
-                net_income_growth = net_income_yoy
-                fcf_growth = fcf_yoy
-
-            #print(revenue_growth, net_income_growth, fcf_growth)
-
-            # Get the latest growth values
-            revenue_growth_latest = revenue_growth.iloc[-1] if not revenue_growth.empty else None
-            net_income_growth_latest = net_income_growth.iloc[-1] if not net_income_growth.empty else None
-            fcf_growth_latest = fcf_growth.iloc[-1] if not fcf_growth.empty else None
-            # Check if growth values are not None
-            if revenue_growth_latest is None or net_income_growth_latest is None or fcf_growth_latest is None:
-                logging.warning(f"Growth data for {ticker} is incomplete. Skipping.")
-                continue
-
-            # Fetch historical data
-            # Fix the order of arguments and handle DataFrame construction properly
-            historical_data = pd.DataFrame(data['HistoricalData']).set_index('Date')[['Close', 'Volume']].dropna()
-            historical_data.index = pd.to_datetime(historical_data.index, utc=True)  # Ensure it's datetime with UTC
-            #print("historical data ", historical_data)
-            if historical_data.empty:
-                logging.warning(f"No historical data for {ticker}. Skipping.")
-                continue
-
-            # Calculate relative strength
-            relative_strength = calculate_relative_strength_from_data(historical_data)
-            # Extract additional metrics from the pre-fetched data
-
-            pe_ratio = data['Info'].get('trailingPE')
-            debt_to_equity = data['Info'].get('debtToEquity')
-
-            roe = data['Info'].get('returnOnEquity') * 100 if data['Info'].get('returnOnEquity') else None
-            dividend_yield = data['Info'].get('dividendYield') * 100 if data['Info'].get('dividendYield') else None
-            
-            market_cap = data['Info'].get('marketCap', 'Unknown')
-            total_cash = data['Info'].get('totalCash', 'Unknown')
-            sector = data['Info'].get('sector', 'Unknown')  # Default to 'Unknown' if the sector is not available
-            
-            # Calculate SMAs
-            historical_data['SMA_20'] = ta.sma(historical_data['Close'], length=20)
-            historical_data['SMA_50'] = ta.sma(historical_data['Close'], length=50)
-            historical_data['SMA_200'] = ta.sma(historical_data['Close'], length=200)
-
-            # Get latest price and SMAs
-            latest_price = historical_data['Close'].iloc[-1]
-            sma_20 = historical_data['SMA_20'].iloc[-1]
-            sma_50 = historical_data['SMA_50'].iloc[-1]
-            sma_200 = historical_data['SMA_200'].iloc[-1]
-
-            # Check if price is above SMAs
-            price_above_sma20_flag = latest_price > sma_20 if not pd.isna(sma_20) else False
-            price_above_sma50_flag = latest_price > sma_50 if not pd.isna(sma_50) else False
-            price_above_sma200_flag = latest_price > sma_200 if not pd.isna(sma_200) else False
-
-            results.append({
-                'Ticker': ticker,
-                'Company Name': company_name,
-                'Revenue Growth': revenue_growth_latest,
-                'Net Income Growth': net_income_growth_latest,
-                'Free Cash Flow Growth': fcf_growth_latest,
-                'Relative Strength': relative_strength,
-                'P/E Ratio': pe_ratio,
-                'Debt-to-Equity': debt_to_equity,
-                'ROE': roe,
-                'Market Cap': market_cap,
-                'Sector': sector,
-                'Price Above SMA 20': price_above_sma20_flag,
-                'Price Above SMA 50': price_above_sma50_flag,
-                'Price Above SMA 200': price_above_sma200_flag
-            })
-
-        #except Exception as e:
-        #    logging.error(f"Error processing data for {ticker}: {e}")
-
-    # Convert to DataFrame for easier filtering
-    df = pd.DataFrame(results)
-
-    if df.empty:
-        st.error("No data available after processing. Please check the data and try again.")
-        return df  # Return the empty DataFrame
-
-    # Fill missing values
-    df['Revenue Growth'] = df['Revenue Growth'].dropna()
-    df['Net Income Growth'] = df['Net Income Growth'].dropna()
-    df['Free Cash Flow Growth'] = df['Free Cash Flow Growth'].dropna()
-    df['Relative Strength'] = df['Relative Strength'].dropna()
-
-    # Apply initial screening thresholds
-    conditions = []
-
-    if revenue_growth_threshold is not None:
-        conditions.append(df['Revenue Growth'] >= revenue_growth_threshold)
-
-    if net_income_growth_threshold is not None:
-        conditions.append(df['Net Income Growth'] >= net_income_growth_threshold)
-
-    if fcf_growth_threshold is not None:
-        conditions.append(df['Free Cash Flow Growth'] >= fcf_growth_threshold)
-
-    # Apply relative strength threshold
-    conditions.append(df['Relative Strength'] >= rs_threshold)
-
-    # Combine conditions based on selected logic
-    if filter_logic == 'ALL':
-        combined_condition = pd.Series(True, index=df.index)
-        for condition in conditions:
-            combined_condition &= condition
-    else:
-        combined_condition = pd.Series(False, index=df.index)
-        for condition in conditions:
-            combined_condition |= condition
-
-    # Apply combined condition
-    screened_df = df[combined_condition]
+# Run screening when button is pressed
+# One result store per server process, shared by every session
+@st.cache_resource
+def get_result_store():
+    return ResultStore()
 
-    return screened_df
+result_store = get_result_store()
 
-# Run screening when button is pressed
 if run_screening:
     with st.spinner('Running screening...'):
         print("Selected market ", selected_market)
-        tickers = get_tickers(selected_market)
-        screened_data = fetch_and_process_data(
-            tickers,
-            growth_type,
-            revenue_growth_threshold,
-            net_income_growth_threshold,
-            fcf_growth_threshold,
-            rs_threshold,
-            filter_logic,
-            selected_market
+        screening_params = {
+            'index_name': selected_market,
+            'growth_type': growth_type,
+            'custom_tickers': custom_tickers,
+        }
+        # Key each mode only by the parameters it uses
+        if rank_mode:
+            screening_params['rank_criteria'] = rank_criteria
+        else:
+            screening_params.update({
+                'revenue_growth_threshold': revenue_growth_threshold,
+                'net_income_growth_threshold': net_income_growth_threshold,
+                'fcf_growth_threshold': fcf_growth_threshold,
+                'rs_threshold': rs_threshold,
+                'filter_logic': filter_logic,
+                'trend_criteria': trend_criteria,
+            })
+        data_version = get_data_version(selected_market)
+        screen_key = result_store.make_key(screening_params, data_version)
+
+        # Reuse the result of any session that screened with the same parameters
+        screened_data = result_store.get(screen_key)
+        tickers = custom_tickers or get_tickers(selected_market)
+        if screened_data is None:
+            if rank_mode:
+                screened_data = fetch_and_rank_data(tickers, growth_type, rank_criteria, selected_market, data_version)
+            else:
+                screened_data = fetch_and_process_data(
+                    tickers,
+                    growth_type,
+                    revenue_growth_threshold,
+                    net_income_growth_threshold,
+                    fcf_growth_threshold,
+                    rs_threshold,
+                    filter_logic,
+                    selected_market,
+                    trend_criteria,
+                    data_version
+                )
+            result_store.put(screen_key, screened_data)
+        st.session_state.screen_key = screen_key
+
+        # Learn the CAGR horizons the index supports from the metrics just loaded
+        st.session_state.setdefault('cagr_horizons', {})[selected_market] = get_cagr_horizons(
+            selected_market, tickers, growth_type, data_version
         )
-        # Save screened data to JSON
-        screened_data.to_json('screened_data.json', orient='records')
-        print(screened_data)
-    st.success('Screening completed and data saved!')
+    st.success('Screening completed!')
 
-# Load and cache the screened data for performance
+# Load the screened data of this session from the result store
 def load_screened_data():
-    if os.path.exists('screened_data.json'):
-        return pd.read_json('./growthiq/screened_data.json')
-    else:
+    screen_key = st.session_state.get('screen_key')
+    screened_data = result_store.get(screen_key) if screen_key else None
+    if screened_data is None:
         st.error("No screened data found. Please run the screening first.")
-        return None
+    return screened_data
+
+# Build the filter index once per screened result and keep it in the session
+def get_filter_index(screened_data):
+    key = st.session_state.get('screen_key')
+    if st.session_state.get('filter_index_key') != key:
+        st.session_state.filter_index = FilterIndex(screened_data)
+        st.session_state.filter_index_key = key
+    return st.session_state.filter_index
+
+# Fetch the price history used to seed and replay the live watchlist
+@st.cache_data(show_spinner=True)
+def fetch_watchlist_history(tickers, period='2y'):
+    from providers import fetch_price_history
+
+    histories, failed = fetch_price_history(list(tickers), period=period)
+    if failed:
+        logging.warning(f"No price history for watchlist tickers: {failed}")
+    return histories
 
 # Main part of the app
 
@@ -400,12 +273,14 @@ show_filtering = st.sidebar.checkbox(
     "Show Filtering Result", 
     value=st.session_state.show_filtering
 )
+view_backtest = st.sidebar.checkbox("Show Backtest", value=False)
+view_correlation = st.sidebar.checkbox("Show Correlation Analytics", value=False)
+view_watchlist = st.sidebar.checkbox("Live Watchlist", value=False)
 
 screened_data = load_screened_data()
 
 # Collapsible table section
-if view_screening:
-    screened_data = load_screened_data()
+if view_screening and screened_data is not None:
     with st.expander("View Screening Result", expanded=True):
         if not screened_data.empty:
             st.subheader("Screened results")
@@ -429,8 +304,10 @@ if screened_data is not None and not screened_data.empty:
             rsi_overbought = st.sidebar.checkbox("RSI Overbought (>70)")
             rsi_oversold = st.sidebar.checkbox("RSI Oversold (<30)")
 
+            filter_index = get_filter_index(screened_data)
+
             # Sector Filter
-            sectors = ['All'] + sorted(screened_data['Sector'].dropna().unique().tolist())
+            sectors = ['All'] + filter_index.sector_names()
             try:
                 selected_sector = st.sidebar.selectbox("Select Sector", sectors)
             except Exception as e:
@@ -439,42 +316,29 @@ if screened_data is not None and not screened_data.empty:
             # Logic Selection for Filtering: AND or OR
             filter_logic_filtering = st.sidebar.selectbox("Filtering Logic", ['ALL', 'ANY'])
 
-            # Apply filters
+            # Apply filters as bitwise operations over the filter index
             def apply_filters(df):
-                conditions = []
-                
-                # Technical Filters
+                flags = []
                 if price_above_sma20:
-                    conditions.append(df['Price Above SMA 20'] == True)
+                    flags.append('Price Above SMA 20')
                 if price_above_sma50:
-                    conditions.append(df['Price Above SMA 50'] == True)
+                    flags.append('Price Above SMA 50')
                 if price_above_sma200:
-                    conditions.append(df['Price Above SMA 200'] == True)
-
-                # Sector Filter
-                if selected_sector != 'All':
-                    conditions.append(df['Sector'] == selected_sector)
-
-                # Combine conditions with logical AND or OR
-                if filter_logic_filtering == 'ALL':
-                    combined_condition = pd.Series(True, index=df.index)
-                    for condition in conditions:
-                        combined_condition &= condition
-                else:
-                    combined_condition = pd.Series(False, index=df.index)
-                    for condition in conditions:
-                        combined_condition |= condition
-
-                # Apply the combined conditions to filter the DataFrame
-                filtered_df = df[combined_condition]
-                return filtered_df
+                    flags.append('Price Above SMA 200')
+
+                rsi_bands = []
+                if rsi_overbought:
+                    rsi_bands.append('Overbought')
+                if rsi_oversold:
+                    rsi_bands.append('Oversold')
+
+                return filter_index.apply(df, flags, rsi_bands, selected_sector, filter_logic_filtering)
 
             print("screened_data ", screened_data)
             filtered_data = apply_filters(screened_data)
 
 else:
     st.write("Please set the screening criteria and click 'RUN SCREENING' to begin.")
-    screened_data = load_screened_data()
 
 
 # Handling the "Show Filtering Result" checkbox and disabling filter controls
@@ -494,7 +358,7 @@ if show_filtering and view_filter_controls:
 
             # Display the filtered results
             st.subheader("Filtered Results")
-            st.dataframe(filtered_data[['Ticker', 'Company Name', 'Revenue Growth', 'Net Income Growth', 'Free Cash Flow Growth', 'Relative Strength', 'Market Cap', 'Sector']])
+            st.dataframe(filtered_data.reindex(columns=['Ticker', 'Company Name', 'Revenue Growth', 'Net Income Growth', 'Free Cash Flow Growth', 'Relative Strength', 'RSI', 'Market Cap', 'Sector']))
 
             # Display charts for selected ticker
             if selected_ticker:
@@ -503,3 +367,110 @@ if show_filtering and view_filter_controls:
 
 else:
     st.warning("Select filtering options from Filter Controls. Then select \'Show Filtering Result'\ to view filtered data.")
+
+# Backtest the current screening criteria at past quarter-ends
+if view_backtest:
+    with st.expander("View Backtest", expanded=True):
+        from backtest import summarize_backtest
+
+        if rank_mode:
+            st.caption("The backtest replays the growth thresholds; rank modes are not backtested.")
+        elif trend_criteria_on:
+            st.caption("The backtest replays the growth and relative strength thresholds; the fundamental trend criteria are not backtested.")
+        horizon_days = st.selectbox("Forward Return Horizon (trading days)", [21, 63, 126], index=1)
+        backtest_summary, backtest_baskets = run_index_backtest(
+            selected_market,
+            growth_type,
+            revenue_growth_threshold,
+            net_income_growth_threshold,
+            fcf_growth_threshold,
+            rs_threshold,
+            filter_logic,
+            horizon_days,
+            get_data_version(selected_market)
+        )
+        if backtest_summary is None or backtest_summary.empty:
+            st.write("Not enough history to backtest the screen.")
+        else:
+            st.subheader("Screen performance at past quarter-ends")
+            st.dataframe(backtest_summary)
+            st.write(summarize_backtest(backtest_summary))
+
+# Correlation, beta and clustering of the screened basket, to spot baskets that
+# are really one sector bet
+if view_correlation and screened_data is not None and not screened_data.empty:
+    with st.expander("Correlation Analytics", expanded=True):
+        from correlation import HEATMAP_MAX_TICKERS, cluster_basket
+        from plot_data import plot_correlation_heatmap
+
+        beta_window = st.selectbox("Beta Window (trading days)", [21, 63, 126], index=1)
+        n_clusters = st.slider("Number of Clusters", 1, 20, 5)
+        basket_analytics = compute_basket_analytics(
+            selected_market,
+            tuple(sorted(screened_data['Ticker'])),
+            get_data_version(selected_market),
+            beta_window
+        )
+        if basket_analytics is None or basket_analytics['corr'].empty:
+            st.write("Not enough price history to analyze the screened tickers.")
+        else:
+            ticker_table, cluster_summary, average_correlation = cluster_basket(basket_analytics, n_clusters)
+            st.metric("Average Pairwise Correlation", f"{average_correlation:.2f}")
+            st.subheader("Clusters")
+            st.dataframe(cluster_summary)
+            st.subheader("Tickers by Cluster")
+            st.dataframe(ticker_table)
+            if len(ticker_table) <= HEATMAP_MAX_TICKERS:
+                st.plotly_chart(plot_correlation_heatmap(basket_analytics['corr'], ticker_table['Ticker']), use_container_width=True)
+            else:
+                st.caption(f"The heatmap is drawn for baskets of up to {HEATMAP_MAX_TICKERS} tickers.")
+
+# Live watchlist of the screened tickers, updated bar by bar from a price feed.
+# Indicators update in constant time per bar and only new points are pushed to the charts.
+if view_watchlist and screened_data is not None and not screened_data.empty:
+    with st.expander("Live Watchlist", expanded=True):
+        import time
+        from streaming import FEEDS, Watchlist, split_for_replay
+
+        watch_tickers = screened_data['Ticker'].tolist()
+        feed_name = st.selectbox("Price Feed", list(FEEDS))
+        chart_ticker = st.selectbox("Chart Ticker", watch_tickers)
+        replay_bars = st.slider("Bars to Replay", 10, 120, 60)
+        bar_delay_ms = st.slider("Delay per Bar (ms)", 0, 50, 0)
+
+        if st.button("Start Stream"):
+            histories = fetch_watchlist_history(tuple(watch_tickers))
+            warm_histories, replay_histories = split_for_replay(histories, replay_bars)
+            watchlist = Watchlist(watch_tickers)
+            chart_history = pd.DataFrame(watchlist.warm(warm_histories, chart_ticker))
+
+            price_columns = ['Close', 'SMA_20', 'SMA_50', 'EMA_20']
+            st.subheader(f"{chart_ticker} (live)")
+            price_chart = st.line_chart(chart_history.set_index('Date')[price_columns] if not chart_history.empty else None)
+            rsi_chart = st.line_chart(chart_history.set_index('Date')[['RSI']] if not chart_history.empty else None)
+            flags_table = st.empty()
+            flags_table.dataframe(watchlist.snapshot())
+            stream_status = st.empty()
+
+            start = time.perf_counter()
+            last_redraw = start
+            flags_dirty = False
+            for bar in FEEDS[feed_name](replay_histories, delay=bar_delay_ms / 1000):
+                point, flags_changed = watchlist.update(bar)
+                if point is None:
+                    continue
+                if bar.ticker == chart_ticker:
+                    row = pd.DataFrame([point]).set_index('Date')
+                    price_chart.add_rows(row[price_columns])
+                    rsi_chart.add_rows(row[['RSI']])
+                flags_dirty = flags_dirty or flags_changed
+
+                # Redraw the flags table only when a flag flipped, at most twice a second
+                if flags_dirty and time.perf_counter() - last_redraw > 0.5:
+                    flags_table.dataframe(watchlist.snapshot())
+                    last_redraw = time.perf_counter()
+                    flags_dirty = False
+
+            flags_table.dataframe(watchlist.snapshot())
+            elapsed = time.perf_counter() - start
+            stream_status.caption(f"{watchlist.updates} updates across {len(watch_tickers)} tickers in {elapsed:.2f}s")
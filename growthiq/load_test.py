@@ -0,0 +1,393 @@
+# load_test.py
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(APP_DIR, 'growth_dashboard.py')
+
+# Index the simulated analysts screen. Its ticker list is read from the bundled
+# NASDAQ csv, so the whole run works offline.
+LOAD_TEST_INDEX = 'NASDAQ Composite'
+
+# Choices sessions draw their screening criteria from. The grid is small on
+# purpose, so concurrent sessions overlap the way analysts using similar
+# criteria do and the shared caches and result store get exercised.
+GROWTH_TYPES = ['QoQ', 'YoY']
+GROWTH_THRESHOLDS = [0, 5, 10]
+RS_THRESHOLDS = [-20, 0]
+FILTER_FLAGS = ['Price Above SMA 20', 'Price Above SMA 50', 'Price Above SMA 200']
+PERIODS = ['6mo', '1y']
+
+# Share of sessions that screen a short custom ticker list instead of the index
+CUSTOM_TICKER_SHARE = 0.3
+
+# Widget element types the simulated sessions interact with
+WIDGET_TYPES = ['selectbox', 'number_input', 'checkbox', 'slider', 'text_input', 'button']
+
+
+# Function to write a synthetic pre-fetched dataset of the load-test index
+# (JSON plus per-ticker blocks) built from the offline fake provider
+def write_synthetic_data(data_dir, ticker_count):
+    import pandas as pd
+    from prefetch_data import build_ticker_record, save_index_data
+    from providers import FakeProvider, fetch_price_history
+
+    tickers = pd.read_csv(os.path.join(APP_DIR, 'nasdaq_components.csv'))['Symbol'].dropna().tolist()[:ticker_count]
+    provider = FakeProvider()
+    histories, _ = fetch_price_history(tickers, provider, period='1y')
+    data_list = [build_ticker_record(ticker, histories[ticker], provider) for ticker in tickers if ticker in histories]
+    save_index_data(data_list, LOAD_TEST_INDEX, data_dir)
+    return [data['Ticker'] for data in data_list]
+
+
+# Function to serve the synthetic dataset with Range support on a free local port
+def start_data_server(data_dir):
+    from range_server import make_server
+
+    server = make_server(data_dir, port=0, quiet=True)
+    threading.Thread(target=server.serve_forever, name='load-test-data', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# Function to start the dashboard in a headless Streamlit server pointed at the
+# synthetic data and the offline price provider
+def start_app_server(port, data_url, status_file, warmup):
+    env = dict(
+        os.environ,
+        GROWTHIQ_DATA_URL=data_url,
+        GROWTHIQ_PRICE_PROVIDER='fake',
+        GROWTHIQ_WARMUP_INDICES=LOAD_TEST_INDEX if warmup else '',
+        GROWTHIQ_WARMUP_STATUS=status_file,
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, '-m', 'streamlit', 'run', APP_FILE,
+            '--server.headless', 'true', '--server.port', str(port), '--server.address', '127.0.0.1',
+            '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false',
+        ],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+# Function to wait until the server answers its health endpoint
+def wait_for_server(port, timeout=60):
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Streamlit server did not start on port {port} within {timeout}s")
+
+
+# Function to read the resident set size of a process in bytes
+def rss_bytes(pid):
+    with open(f'/proc/{pid}/statm', 'r') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+# Minimal headless browser session speaking Streamlit's websocket protocol: it
+# requests reruns with the current widget states and collects the widgets and
+# exceptions each run renders
+class HeadlessSession:
+    def __init__(self, port, timeout):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.timeout = timeout
+        self.connection = None
+        self.widgets = {}
+        self.states = {}
+        self.message_cache = {}
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.connection = await websocket_connect(self.url, max_message_size=256 * 2**20)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    # Function to run the script once with the current widget states plus the
+    # given overrides; returns (seconds, exception messages)
+    async def rerun(self, overrides=None):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        states = dict(self.states)
+        states.update(overrides or {})
+        back_msg = BackMsg()
+        back_msg.rerun_script.query_string = ''
+        back_msg.rerun_script.page_script_hash = ''
+        back_msg.rerun_script.widget_states.widgets.extend(states.values())
+
+        widgets = {}
+        exceptions = []
+        start = time.perf_counter()
+        await self.connection.write_message(back_msg.SerializeToString(), binary=True)
+        while True:
+            payload = await asyncio.wait_for(self.connection.read_message(), self.timeout)
+            if payload is None:
+                raise ConnectionError("server closed the session")
+            msg = ForwardMsg()
+            msg.ParseFromString(payload)
+            if msg.HasField('ref_hash'):
+                msg = self.message_cache[msg.ref_hash]
+            elif msg.metadata.cacheable:
+                self.message_cache[msg.hash] = msg
+
+            kind = msg.WhichOneof('type')
+            if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    widgets[widget.label] = (element_type, widget)
+                elif element_type == 'exception':
+                    exceptions.append(f"{element.exception.type}: {element.exception.message}")
+            elif kind == 'script_finished':
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+        seconds = time.perf_counter() - start
+
+        # Like the browser, keep the state of the widgets rendered by this run
+        self.widgets = widgets
+        self.states = {
+            widget.id: states.get(widget.id) or self.default_state(element_type, widget)
+            for element_type, widget in widgets.values() if element_type != 'button'
+        }
+        return seconds, exceptions
+
+    def default_state(self, element_type, widget):
+        if element_type == 'slider':
+            return self.make_state(element_type, widget, list(widget.default))
+        return self.make_state(element_type, widget, widget.default)
+
+    def make_state(self, element_type, widget, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        from streamlit.runtime.state.widgets import ELEMENT_TYPE_TO_VALUE_TYPE
+
+        state = WidgetState(id=widget.id)
+        value_type = ELEMENT_TYPE_TO_VALUE_TYPE[element_type]
+        if value_type == 'double_array_value':
+            state.double_array_value.data.extend(value)
+        else:
+            setattr(state, value_type, value)
+        return state
+
+    # Function to build the widget-state override that sets a widget by label;
+    # selectboxes take the option, sliders a single value. Returns {} if the
+    # widget is not on the page.
+    def set_widget(self, label, value):
+        if label not in self.widgets:
+            return {}
+        element_type, widget = self.widgets[label]
+        if element_type == 'selectbox':
+            if value not in widget.options:
+                return {}
+            value = list(widget.options).index(value)
+        elif element_type == 'slider':
+            value = [value]
+        elif element_type == 'button':
+            value = True
+        return {widget.id: self.make_state(element_type, widget, value)}
+
+
+# One simulated analyst: opens the app, chooses an index and criteria, runs a
+# screen, toggles filters and charts tickers. Every step is a rerun whose
+# latency is recorded.
+class Session:
+    def __init__(self, session_no, port, tickers, seed, timeout, think_seconds):
+        self.client = HeadlessSession(port, timeout)
+        self.tickers = tickers
+        self.rng = random.Random(seed * 100003 + session_no)
+        self.think_seconds = think_seconds
+        self.timings = []
+        self.errors = []
+
+    async def step(self, name, overrides=None):
+        if self.think_seconds:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.think_seconds))
+        try:
+            seconds, exceptions = await self.client.rerun(overrides)
+        except Exception as e:
+            self.errors.append(f"{name}: {type(e).__name__}: {e}")
+            return False
+        self.timings.append((name, seconds))
+        self.errors.extend(f"{name}: {exception}" for exception in exceptions)
+        return True
+
+    async def run(self):
+        client = self.client
+        rng = self.rng
+        try:
+            await client.connect()
+        except Exception as e:
+            self.errors.append(f"connect: {e}")
+            return self
+        if not await self.step('open app'):
+            return self
+
+        # Choose the index and screening criteria, then run the screening
+        criteria = {}
+        criteria.update(client.set_widget("Select Market Index", LOAD_TEST_INDEX))
+        criteria.update(client.set_widget("Select Growth Type", rng.choice(GROWTH_TYPES)))
+        threshold = rng.choice(GROWTH_THRESHOLDS)
+        for label in ["Revenue Growth Threshold (%)", "Net Income Growth Threshold (%)", "Free Cash Flow Growth (%)"]:
+            criteria.update(client.set_widget(label, threshold))
+        criteria.update(client.set_widget("Relative Strength Threshold (%)", rng.choice(RS_THRESHOLDS)))
+        if rng.random() < CUSTOM_TICKER_SHARE:
+            custom = ', '.join(rng.sample(self.tickers, min(10, len(self.tickers))))
+            criteria.update(client.set_widget("Custom Tickers (optional, comma separated)", custom))
+        if not await self.step('choose criteria', criteria):
+            return self
+        if not await self.step('run screening', client.set_widget("RUN SCREENING", True)):
+            return self
+
+        # Toggle the filter controls and a technical filter
+        if not await self.step('show filter controls', client.set_widget("Show Filter Controls", True)):
+            return self
+        filters = {}
+        filters.update(client.set_widget(rng.choice(FILTER_FLAGS), True))
+        filters.update(client.set_widget("Filtering Logic", 'ANY'))
+        if not await self.step('toggle filters', filters):
+            return self
+        if not await self.step('show filtering result', client.set_widget("Show Filtering Result", True)):
+            return self
+
+        # Chart a couple of the filtered tickers
+        for _ in range(2):
+            if "Select a Ticker" not in client.widgets:
+                break
+            options = list(client.widgets["Select a Ticker"][1].options)
+            pick = {}
+            pick.update(client.set_widget("Select a Ticker", rng.choice(options)))
+            pick.update(client.set_widget("Select Time Period", rng.choice(PERIODS)))
+            if not await self.step('pick ticker', pick):
+                break
+        return self
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 1) if values else None
+
+
+# Function to summarize the latencies of a set of finished sessions
+def summarize_sessions(sessions, wall_seconds):
+    latencies = [seconds for session in sessions for _, seconds in session.timings]
+    steps = {}
+    for session in sessions:
+        for step, seconds in session.timings:
+            steps.setdefault(step, []).append(seconds)
+    return {
+        'sessions': len(sessions),
+        'reruns': len(latencies),
+        'errors': sum(len(session.errors) for session in sessions),
+        'wall_seconds': round(wall_seconds, 3),
+        'reruns_per_second': round(len(latencies) / wall_seconds, 2) if wall_seconds else None,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'steps_ms': {step: {'p50': percentile(values, 50), 'p95': percentile(values, 95)} for step, values in steps.items()},
+        'sample_errors': sorted({error for session in sessions for error in session.errors})[:5],
+    }
+
+
+# Function to run `count` sessions at once against the server and measure
+# latency, throughput and how much server memory the sessions hold
+async def run_level(count, port, server_pid, tickers, seed, timeout, think_seconds):
+    rss_before = rss_bytes(server_pid)
+    sessions = [Session(session_no, port, tickers, seed, timeout, think_seconds) for session_no in range(count)]
+    start = time.perf_counter()
+    await asyncio.gather(*(session.run() for session in sessions))
+    wall_seconds = time.perf_counter() - start
+
+    # Sessions are still connected here, so their state counts towards the RSS
+    rss_after = rss_bytes(server_pid)
+    for session in sessions:
+        session.client.close()
+
+    summary = summarize_sessions(sessions, wall_seconds)
+    summary['server_rss_mb'] = round(rss_after / 2**20, 1)
+    summary['memory_per_session_mb'] = round(max(rss_after - rss_before, 0) / count / 2**20, 2)
+    return summary
+
+
+def print_level(label, summary):
+    print(
+        f"{label:<10} {summary['sessions']:>4} sessions {summary['reruns']:>5} reruns "
+        f"{summary['reruns_per_second']:>7} reruns/s  p50 {summary['p50_ms']} ms  "
+        f"p95 {summary['p95_ms']} ms  p99 {summary['p99_ms']} ms  "
+        f"{summary['memory_per_session_mb']} MB/session  errors {summary['errors']}"
+    )
+    for step, latency in summary['steps_ms'].items():
+        print(f"{'':<10}   {step:<22} p50 {latency['p50']:>9} ms  p95 {latency['p95']:>9} ms")
+    for error in summary['sample_errors']:
+        print(f"{'':<10}   error: {error[:200]}")
+
+
+async def run_load_test(args, port, server_pid, tickers):
+    # A solo session on cold caches first, then each concurrency level
+    results = {'cold': await run_level(1, port, server_pid, tickers, args.seed, args.timeout, 0), 'levels': []}
+    print_level('cold', results['cold'])
+    for count in args.sessions:
+        summary = await run_level(count, port, server_pid, tickers, args.seed + count, args.timeout, args.think_ms / 1000)
+        results['levels'].append(summary)
+        print_level('concurrent', summary)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent headless sessions on synthetic offline data.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 25], help="concurrent session counts to measure")
+    parser.add_argument('--tickers', type=int, default=300, help="tickers in the synthetic index")
+    parser.add_argument('--think-ms', type=float, default=0, help="mean pause between a session's steps")
+    parser.add_argument('--timeout', type=float, default=300, help="seconds to wait for one rerun")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=None, help="port of the dashboard server (a free one by default)")
+    parser.add_argument('--warmup', action='store_true', help="let the app's startup warm-up preload the index")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='growthiq-load-')
+    tickers = write_synthetic_data(data_dir, args.tickers)
+    data_server, data_url = start_data_server(data_dir)
+    port = args.port or free_port()
+    app_server = start_app_server(port, data_url, os.path.join(data_dir, 'warmup.json'), args.warmup)
+    print(f"Serving {len(tickers)} synthetic tickers from {data_url}; dashboard on port {port}")
+
+    try:
+        wait_for_server(port)
+        results = asyncio.run(run_load_test(args, port, app_server.pid, tickers))
+    finally:
+        app_server.terminate()
+        app_server.wait()
+        data_server.shutdown()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
-
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+# plotly is imported inside the plotting functions so that importing this
+# module stays cheap until a chart is actually drawn
 
 
 # Plot fundamental data with price overlay
 def plot_fundamentals(fundamental_timeseries, historical_data):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     # Create figure
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
@@ -71,6 +73,9 @@ def plot_fundamentals(fundamental_timeseries, historical_data):
 
 # Plot comprehensive technical chart
 def plot_technical_chart(historical_data):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     fig = make_subplots(
         rows=4, cols=1,
         shared_xaxes=True,
@@ -159,3 +164,24 @@ def plot_technical_chart(historical_data):
     fig.update_yaxes(title_text="MACD Hist", row=4, col=1)
 
     return fig
+
+
+# Plot a correlation matrix as a heatmap, with tickers ordered by cluster
+def plot_correlation_heatmap(corr, order):
+    import plotly.graph_objects as go
+
+    ordered = corr.loc[order, order]
+    fig = go.Figure(
+        go.Heatmap(
+            z=ordered.to_numpy(),
+            x=ordered.columns,
+            y=ordered.index,
+            zmin=-1,
+            zmax=1,
+            colorscale='RdBu',
+            reversescale=True,
+            colorbar=dict(title='Correlation')
+        )
+    )
+    fig.update_layout(title='Return Correlation (ordered by cluster)', height=700, yaxis=dict(autorange='reversed'))
+    return fig
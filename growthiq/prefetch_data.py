@@ -1,10 +1,20 @@
 # prefetch_data.py
-import yfinance as yf
+import argparse
+import os
 import pandas as pd
 import json
 import time
 import logging
+from multiprocessing import Process
 from tqdm import tqdm
+from blocks import write_block_file
+from providers import PRICE_CHUNK_SIZE, fetch_price_history, get_provider
+from shard_queue import LEASE_SECONDS, MAX_ATTEMPTS, ShardQueue, make_shards, run_worker
+
+INDEX_NAMES = ["S&P500 Index", "NASDAQ Composite", "Dow Jones Industrial Index"]
+
+# Tickers per shard of the distributed prefetch
+SHARD_SIZE = int(os.environ.get('GROWTHIQ_SHARD_SIZE', 200))
 
 
 # Function to get tickers for the selected market index
@@ -29,49 +39,61 @@ def get_tickers(market_index):
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def fetch_ticker_data(tickers, index_name):
+# Function to name the data file of an index
+def index_data_file(index_name, output_dir='.'):
+    return os.path.join(output_dir, f'{index_name.lower().replace(" ", "_")}_data.json')
+
+
+# Function to build the pre-fetched record of one ticker from its daily bars
+# and the provider's quarterly statements and profile
+def build_ticker_record(ticker, historical_data, provider):
+    statements = provider.quarterly_statements(ticker)
+
+    # Fetch financial data
+    financials = statements['Financials'].T
+    cashflow = statements['Cashflow'].T
+    balance_sheet = statements['BalanceSheet'].T
+
+    # Convert index to string
+    financials.index = financials.index.astype(str)
+    cashflow.index = cashflow.index.astype(str)
+    balance_sheet.index = balance_sheet.index.astype(str)
+
+    # Convert historical data index to string
+    historical_data = historical_data.reset_index()
+    historical_data['Date'] = historical_data['Date'].astype(str)
+
+    # Store data in a dictionary
+    return {
+        'Ticker': ticker,
+        'Financials': financials.to_dict(),
+        'Cashflow': cashflow.to_dict(),
+        'BalanceSheet': balance_sheet.to_dict(),
+        'HistoricalData': historical_data.to_dict(orient='list'),
+        'Info': provider.info(ticker)
+    }
+
+
+# Function to fetch the records (prices, statements, info) of a list of tickers
+def fetch_ticker_records(tickers, index_name, provider=None, chunk_size=PRICE_CHUNK_SIZE):
+    provider = provider or get_provider()
     data_list = []
     success_count = 0
     error_count = 0
 
+    # Fetch historical data for all tickers in batched requests
+    histories, failed = fetch_price_history(tickers, provider, period='1y', chunk_size=chunk_size)  # Adjust period as needed
+    if failed:
+        logging.warning(f"No price history for {len(failed)} {index_name} tickers: {failed}")
+
     pbar = tqdm(tickers, desc=f"Fetching {index_name} data", unit="ticker")
     for ticker in pbar:
         try:
-            stock = yf.Ticker(ticker)
-
-            # Fetch historical data
-            historical_data = stock.history(period='1y')  # Adjust period as needed
-            if len(historical_data) < 150:
+            historical_data = histories.get(ticker)
+            if historical_data is None or len(historical_data) < 150:
                 continue
 
-            # Fetch financial data
-            financials = stock.quarterly_financials.T
-            cashflow = stock.quarterly_cashflow.T
-            balance_sheet = stock.quarterly_balance_sheet.T
-
-            # Convert index to string
-            financials.index = financials.index.astype(str)
-            cashflow.index = cashflow.index.astype(str)
-            balance_sheet.index = balance_sheet.index.astype(str)
-
-            # Convert historical data index to string
-            historical_data.reset_index(inplace=True)
-            historical_data['Date'] = historical_data['Date'].astype(str)
-
-            # Fetch other info
-            info = stock.info
-
-            # Store data in a dictionary
-            data = {
-                'Ticker': ticker,
-                'Financials': financials.to_dict(),
-                'Cashflow': cashflow.to_dict(),
-                'BalanceSheet': balance_sheet.to_dict(),
-                'HistoricalData': historical_data.to_dict(orient='list'),
-                'Info': info
-            }
-
-            data_list.append(data)
+            data_list.append(build_ticker_record(ticker, historical_data, provider))
 
             success_count += 1
             pbar.set_description(f"Fetching {index_name} data (Success: {success_count}, Errors: {error_count})")
@@ -85,25 +107,145 @@ def fetch_ticker_data(tickers, index_name):
             pbar.set_description(f"Fetching {index_name} data (Success: {success_count}, Errors: {error_count})")
             logging.error(f"Error fetching data for {ticker}: {e}")
 
-    # Save data to a JSON file
-    file_name = f'{index_name.lower().replace(" ", "_")}_data.json'
+    return data_list
+
+
+# Function to save an index dataset as JSON plus its per-ticker compressed blocks
+def save_index_data(data_list, index_name, output_dir='.'):
+    file_name = index_data_file(index_name, output_dir)
     with open(file_name, 'w') as f:
         json.dump(data_list, f)
 
+    # Publish per-ticker compressed blocks so small ticker lists can be read with Range requests
+    write_block_file(data_list, file_name)
+
     logging.info(f"{index_name} data fetching completed. Data saved to '{file_name}'.")
+    return file_name
+
 
+def fetch_ticker_data(tickers, index_name, provider=None, chunk_size=PRICE_CHUNK_SIZE):
+    save_index_data(fetch_ticker_records(tickers, index_name, provider, chunk_size), index_name)
 
-def prefetch_data():
+
+def prefetch_data(provider=None, chunk_size=PRICE_CHUNK_SIZE):
     # Fetch tickers for each market index
     sp500_tickers = get_tickers("S&P500 Index")
     nasdaq_comp_tickers = get_tickers("NASDAQ Composite")
     dow_tickers = get_tickers("Dow Jones Industrial Index")
 
     # Fetch and store data for each index in separate files
-    fetch_ticker_data(sp500_tickers, "S&P500 Index")
-    fetch_ticker_data(nasdaq_comp_tickers, "NASDAQ Composite")
-    fetch_ticker_data(dow_tickers, "Dow Jones Industrial Index")
+    fetch_ticker_data(sp500_tickers, "S&P500 Index", provider, chunk_size)
+    fetch_ticker_data(nasdaq_comp_tickers, "NASDAQ Composite", provider, chunk_size)
+    fetch_ticker_data(dow_tickers, "Dow Jones Industrial Index", provider, chunk_size)
+
+
+# Distributed prefetch: a coordinator splits every index into shards on a
+# SQLite lease queue, any number of workers (processes or hosts sharing the
+# queue and shard directory) fetch shards, and a merge step assembles the
+# index files once every shard is done.
+
+# Function to split every index into shards on the queue
+def coordinate_prefetch(queue, shard_size=SHARD_SIZE, index_names=INDEX_NAMES):
+    for index_name in index_names:
+        queue.enqueue(index_name, make_shards(get_tickers(index_name), shard_size))
+
+
+# Function to fetch one shard and write its records to the shard directory.
+# Every attempt writes its own file, so a stalled worker finishing late never
+# clobbers the output recorded for the attempt that completed the shard.
+def fetch_shard(shard, shard_dir, provider=None, chunk_size=PRICE_CHUNK_SIZE):
+    data_list = fetch_ticker_records(shard['tickers'], shard['index_name'], provider, chunk_size)
+    if not data_list:
+        raise RuntimeError(f"no data fetched for any of {len(shard['tickers'])} tickers")
+
+    stem = os.path.basename(index_data_file(shard['index_name']))[:-len('_data.json')]
+    output = os.path.join(shard_dir, f"{stem}.shard{shard['shard_no']:05d}.attempt{shard['attempt']}.json")
+    with open(f"{output}.tmp", 'w') as f:
+        json.dump(data_list, f)
+    os.replace(f"{output}.tmp", output)
+    return output
+
+
+# Function to run one worker process until the queue is drained
+def prefetch_worker(queue_path, shard_dir, provider_name=None, chunk_size=PRICE_CHUNK_SIZE,
+                    lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, poll_seconds=5):
+    os.makedirs(shard_dir, exist_ok=True)
+    queue = ShardQueue(queue_path, lease_seconds, max_attempts)
+    provider = get_provider(provider_name)
+    return run_worker(queue, lambda shard: fetch_shard(shard, shard_dir, provider, chunk_size), poll_seconds=poll_seconds)
+
+
+# Function to run several local worker processes against the same queue
+def run_prefetch_workers(processes, queue_path, shard_dir, provider_name=None, chunk_size=PRICE_CHUNK_SIZE,
+                         lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    if processes <= 1:
+        prefetch_worker(queue_path, shard_dir, provider_name, chunk_size, lease_seconds, max_attempts)
+        return
+    workers = [
+        Process(target=prefetch_worker, args=(queue_path, shard_dir, provider_name, chunk_size, lease_seconds, max_attempts))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+# Function to assemble the index files from completed shards found in
+# shard_dir (workers record their own paths, which may differ on this host).
+# Indices with missing shards are skipped unless allow_partial is set. Returns
+# the incomplete index names.
+def merge_shards(queue, shard_dir, output_dir='.', allow_partial=False):
+    incomplete = []
+    for index_name in queue.index_names():
+        shards = queue.shards(index_name)
+        pending = [shard['shard_no'] for shard in shards if shard['status'] != 'done']
+        if pending:
+            logging.error(f"{index_name}: {len(pending)} of {len(shards)} shards not done: {pending}")
+            incomplete.append(index_name)
+            if not allow_partial:
+                continue
+
+        data_list = []
+        seen = set()
+        for shard in shards:
+            if shard['status'] != 'done':
+                continue
+            with open(os.path.join(shard_dir, os.path.basename(shard['output'])), 'r') as f:
+                for data in json.load(f):
+                    if data['Ticker'] not in seen:
+                        seen.add(data['Ticker'])
+                        data_list.append(data)
+        save_index_data(data_list, index_name, output_dir)
+    return incomplete
 
 
 if __name__ == "__main__":
-    prefetch_data()
+    parser = argparse.ArgumentParser(description="Pre-fetch index data for the dashboard.")
+    parser.add_argument('--mode', choices=['local', 'coordinator', 'worker', 'merge', 'status'], default='local',
+                        help="local fetches everything in this process; the other modes run the distributed prefetch")
+    parser.add_argument('--chunk-size', type=int, default=PRICE_CHUNK_SIZE, help="tickers per batched price request")
+    parser.add_argument('--provider', default=None, help="price provider (yahoo or fake); defaults to $GROWTHIQ_PRICE_PROVIDER or yahoo")
+    parser.add_argument('--queue', default='prefetch_queue.db', help="SQLite shard queue shared by coordinator and workers")
+    parser.add_argument('--shard-dir', default='shards', help="directory for shard outputs, shared by workers and merge")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help="tickers per shard")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes to start on this host")
+    parser.add_argument('--lease-seconds', type=int, default=LEASE_SECONDS, help="lease after which a stalled shard is re-leased")
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS, help="attempts before a shard is marked failed")
+    parser.add_argument('--output-dir', default='.', help="directory for the merged index files")
+    parser.add_argument('--allow-partial', action='store_true', help="merge indices even if some shards failed")
+    args = parser.parse_args()
+
+    if args.mode == 'local':
+        prefetch_data(get_provider(args.provider), args.chunk_size)
+    elif args.mode == 'coordinator':
+        coordinate_prefetch(ShardQueue(args.queue, args.lease_seconds, args.max_attempts), args.shard_size)
+    elif args.mode == 'worker':
+        run_prefetch_workers(args.processes, args.queue, args.shard_dir, args.provider, args.chunk_size,
+                             args.lease_seconds, args.max_attempts)
+    elif args.mode == 'merge':
+        if merge_shards(ShardQueue(args.queue), args.shard_dir, args.output_dir, args.allow_partial) and not args.allow_partial:
+            raise SystemExit(1)
+    else:
+        for index_name, counts in ShardQueue(args.queue).status().items():
+            print(f"{index_name}: {counts}")
@@ -0,0 +1,230 @@
+# providers.py
+import logging
+import os
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+# Tickers per batched price request
+PRICE_CHUNK_SIZE = int(os.environ.get('GROWTHIQ_PRICE_CHUNK_SIZE', 100))
+
+# Business days covered by the yfinance-style periods used in the app
+PERIOD_DAYS = {'d': 1, 'wk': 5, 'mo': 21, 'y': 252}
+
+
+# Function to convert a yfinance period ('6mo', '1y', 'max', ...) to business days
+def period_to_days(period):
+    if period == 'max':
+        return 252 * 10
+    for unit in sorted(PERIOD_DAYS, key=len, reverse=True):
+        if period.endswith(unit):
+            return int(period[:-len(unit)]) * PERIOD_DAYS[unit]
+    raise ValueError(f"Unsupported period: {period}")
+
+
+# Quarterly statements returned by quarterly_statements(), shaped like
+# yfinance's (one row per line item, one column per quarter end)
+STATEMENTS = ['Financials', 'Cashflow', 'BalanceSheet']
+
+SECTORS = ['Technology', 'Healthcare', 'Financial Services', 'Consumer Cyclical', 'Industrials', 'Energy']
+
+
+# Interface of a market data source. download() fetches the daily bars of a
+# chunk of tickers in one request; history() fetches a single ticker (used for
+# retries and charts); quarterly_statements() and info() return a ticker's
+# fundamentals and profile.
+class PriceProvider(ABC):
+    @abstractmethod
+    def history(self, ticker, period='1y'):
+        pass
+
+    @abstractmethod
+    def download(self, tickers, period='1y'):
+        pass
+
+    @abstractmethod
+    def quarterly_statements(self, ticker):
+        pass
+
+    @abstractmethod
+    def info(self, ticker):
+        pass
+
+
+# Yahoo Finance through yfinance
+class YahooProvider(PriceProvider):
+    def history(self, ticker, period='1y'):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).history(period=period)
+
+    def download(self, tickers, period='1y'):
+        import yfinance as yf
+
+        # ignore_tz=False keeps the exchange timezone on the dates, as Ticker.history does
+        frame = yf.download(
+            list(tickers), period=period, group_by='ticker', auto_adjust=True, actions=True,
+            threads=True, progress=False, ignore_tz=False,
+        )
+        if frame is None or frame.empty:
+            return {}
+
+        # Split the combined (ticker, field) columns back into per-ticker frames
+        histories = {}
+        available = set(frame.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker in available:
+                history = frame[ticker].dropna(how='all')
+                if not history.empty:
+                    history.index.name = 'Date'
+                    histories[ticker] = history
+        return histories
+
+    def quarterly_statements(self, ticker):
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        return {
+            'Financials': stock.quarterly_financials,
+            'Cashflow': stock.quarterly_cashflow,
+            'BalanceSheet': stock.quarterly_balance_sheet,
+        }
+
+    def info(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info
+
+
+# Offline provider with deterministic synthetic prices, for tests and load tests.
+# Tickers in fail_tickers never return data; tickers in flaky_tickers are missing
+# from batched downloads but succeed when retried on their own.
+class FakeProvider(PriceProvider):
+    def __init__(self, fail_tickers=(), flaky_tickers=(), end=None):
+        self.fail_tickers = set(fail_tickers)
+        self.flaky_tickers = set(flaky_tickers)
+        self.end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+        self.requests = 0
+
+    def make_history(self, ticker, period):
+        days = period_to_days(period)
+        dates = pd.bdate_range(end=self.end, periods=days, tz='America/New_York', name='Date')
+        rng = np.random.default_rng(zlib.crc32(ticker.encode('utf-8')))
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0004, 0.02, days))) * (1 + rng.random())
+        spread = np.abs(rng.normal(0, 0.01, days))
+        return pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.005, days)),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(100_000, 5_000_000, days),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0,
+        }, index=dates)
+
+    def history(self, ticker, period='1y'):
+        self.requests += 1
+        if ticker in self.fail_tickers:
+            return pd.DataFrame()
+        return self.make_history(ticker, period)
+
+    # Batched downloads have timezone-naive dates (yf.download's default), unlike
+    # history(), so consumers must align the two on trading days
+    def download(self, tickers, period='1y'):
+        self.requests += 1
+        return {
+            ticker: self.make_history(ticker, period).tz_localize(None)
+            for ticker in tickers
+            if ticker not in self.fail_tickers and ticker not in self.flaky_tickers
+        }
+
+    def quarterly_statements(self, ticker, quarters=8):
+        self.requests += 1
+        if ticker in self.fail_tickers:
+            return {statement: pd.DataFrame() for statement in STATEMENTS}
+        rng = np.random.default_rng(zlib.crc32(f"{ticker}:statements".encode('utf-8')))
+        dates = pd.date_range(end=self.end, periods=quarters, freq='Q')[::-1]
+
+        # Revenue compounding at a per-ticker rate, with noisy margins
+        growth = rng.normal(0.03, 0.05)
+        revenue = 1e8 * (1 + 50 * rng.random()) * np.cumprod(1 + rng.normal(growth, 0.04, quarters))[::-1]
+        net_income = revenue * rng.normal(0.12, 0.08, quarters)
+        free_cash_flow = revenue * rng.normal(0.10, 0.08, quarters)
+        equity = revenue * (2 + rng.random())
+        return {
+            'Financials': pd.DataFrame(
+                [revenue, net_income, net_income], columns=dates,
+                index=['Total Revenue', 'Net Income', 'Net Income Common Stockholders'],
+            ),
+            'Cashflow': pd.DataFrame([free_cash_flow], columns=dates, index=['Free Cash Flow']),
+            'BalanceSheet': pd.DataFrame(
+                [equity * 1.8, equity], columns=dates, index=['Total Assets', 'Stockholders Equity'],
+            ),
+        }
+
+    def info(self, ticker):
+        self.requests += 1
+        rng = np.random.default_rng(zlib.crc32(f"{ticker}:info".encode('utf-8')))
+        return {
+            'symbol': ticker,
+            'longName': f"{ticker} Synthetic Corp",
+            'sector': SECTORS[int(rng.integers(len(SECTORS)))],
+            'marketCap': int(rng.integers(10**8, 10**12)),
+            'totalCash': int(rng.integers(10**6, 10**10)),
+            'trailingPE': float(rng.uniform(5, 60)),
+            'debtToEquity': float(rng.uniform(0, 200)),
+            'returnOnEquity': float(rng.uniform(-0.1, 0.4)),
+            'dividendYield': float(rng.uniform(0, 0.04)),
+        }
+
+
+PROVIDERS = {
+    'yahoo': YahooProvider,
+    'fake': FakeProvider,
+}
+
+
+# Function to get the configured price provider (GROWTHIQ_PRICE_PROVIDER, default yahoo)
+def get_provider(name=None):
+    name = name or os.environ.get('GROWTHIQ_PRICE_PROVIDER', 'yahoo')
+    return PROVIDERS[name]()
+
+
+# Function to fetch daily bars for many tickers with one request per chunk,
+# then retry every symbol missing from the batches on its own.
+# Returns ({ticker: DataFrame}, [tickers that still failed]).
+def fetch_price_history(tickers, provider=None, period='1y', chunk_size=PRICE_CHUNK_SIZE, retries=2):
+    provider = provider or get_provider()
+    tickers = list(dict.fromkeys(tickers))
+    histories = {}
+
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        try:
+            frames = provider.download(chunk, period)
+        except Exception as e:
+            logging.warning(f"Batched price request for {len(chunk)} tickers failed: {e}")
+            frames = {}
+        histories.update({ticker: frame for ticker, frame in frames.items() if not frame.empty})
+
+    missing = [ticker for ticker in tickers if ticker not in histories]
+    for attempt in range(retries):
+        if not missing:
+            break
+        logging.info(f"Retrying {len(missing)} tickers individually (attempt {attempt + 1}/{retries})")
+        still_missing = []
+        for ticker in missing:
+            try:
+                history = provider.history(ticker, period)
+            except Exception as e:
+                logging.warning(f"Price request for {ticker} failed: {e}")
+                history = None
+            if history is not None and not history.empty:
+                histories[ticker] = history
+            else:
+                still_missing.append(ticker)
+        missing = still_missing
+
+    return histories, missing
@@ -0,0 +1,78 @@
+# range_server.py
+import argparse
+import functools
+import os
+import re
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+# Static file handler that honours single-range "Range: bytes=start-end" requests,
+# standing in for the blob storage when testing ranged reads locally
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    def send_head(self):
+        self.range_length = None
+        match = RANGE_PATTERN.match(self.headers.get('Range', '').strip())
+        path = self.translate_path(self.path)
+        if not match or not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        start, end = match.groups()
+        if start:
+            start, end = int(start), min(int(end) if end else size - 1, size - 1)
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(end or 0), 0), size - 1
+        if start > end or start >= size:
+            self.send_error(416, "Requested Range Not Satisfiable")
+            return None
+
+        f = open(path, 'rb')
+        f.seek(start)
+        self.send_response(206)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Last-Modified', self.date_time_string(int(os.path.getmtime(path))))
+        self.end_headers()
+        self.range_length = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        length = self.range_length
+        if length is None:
+            return super().copyfile(source, outputfile)
+        while length > 0:
+            chunk = source.read(min(64 * 1024, length))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            length -= len(chunk)
+
+
+# Range handler that does not log every request (for load tests)
+class QuietRangeRequestHandler(RangeRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# Function to create a threaded range-capable server for a directory
+def make_server(directory, host='127.0.0.1', port=8000, quiet=False):
+    handler = functools.partial(QuietRangeRequestHandler if quiet else RangeRequestHandler, directory=directory)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve pre-fetched index data with HTTP Range support.")
+    parser.add_argument('--dir', default='.', help="directory holding the *_data.json/.blocks/.index.json files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = make_server(args.dir, args.host, args.port)
+    print(f"Serving {os.path.abspath(args.dir)} with Range support on http://{args.host}:{args.port}")
+    print(f"Point the dashboard at it with GROWTHIQ_DATA_URL=http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,147 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Metrics of the screening result that get precomputed ranks (higher is better)
+RANK_METRICS = ['Revenue Growth', 'Net Income Growth', 'Free Cash Flow Growth', 'Relative Strength']
+
+COMPOSITE = 'Composite Score'
+
+# Composite weightings whose rankings are kept, least recently used evicted first
+COMPOSITE_CACHE_SIZE = 16
+
+
+# Cross-sectional rank index over a metrics table. It is built once per metrics
+# computation and stores, for every rank metric, the global and within-sector
+# percentile ranks and the row orderings sorted best first (globally, and by
+# sector then best first), so top-K and top-percent queries are array slices
+# instead of a sort of the DataFrame on every interaction. One index is shared
+# by every session, so composite rankings are kept in a small LRU behind a lock.
+class RankIndex:
+    def __init__(self, df, metrics=RANK_METRICS):
+        self.df = df.reset_index(drop=True)
+        self.size = len(self.df)
+        self.metrics = [metric for metric in metrics if metric in self.df]
+
+        sectors = self.df['Sector'] if 'Sector' in self.df else pd.Series('Unknown', index=self.df.index)
+        self.sector_codes, self.sector_names = pd.factorize(sectors.fillna('Unknown'))
+
+        self.percentiles = {}
+        self.sector_percentiles = {}
+        self.orders = {}
+        self.sector_orders = {}
+        for metric in self.metrics:
+            values = pd.to_numeric(self.df[metric], errors='coerce').to_numpy(dtype=float)
+            self.add_ranking(metric, values)
+        self.composites = OrderedDict()
+        self.lock = threading.RLock()
+
+    # Function to precompute the percentiles and orderings of one score array
+    # (rows without a value are left out of the orderings)
+    def add_ranking(self, name, values):
+        values = np.where(np.isfinite(values), values, np.nan)
+        series = pd.Series(values)
+        self.percentiles[name] = (series.rank(method='max', pct=True) * 100).to_numpy()
+        self.sector_percentiles[name] = (series.groupby(self.sector_codes).rank(method='max', pct=True) * 100).to_numpy()
+
+        valid = np.flatnonzero(np.isfinite(values))
+        self.orders[name] = valid[np.argsort(-values[valid], kind='stable')]
+
+        # Sorted by sector, then best first; each sector is one contiguous slice
+        by_sector = valid[np.lexsort((-values[valid], self.sector_codes[valid]))]
+        bounds = np.searchsorted(self.sector_codes[by_sector], np.arange(len(self.sector_names) + 1))
+        self.sector_orders[name] = (by_sector, bounds)
+
+    # Function to get the ranking name of a composite score, computing the score
+    # on first use. The score is the weighted mean of the metrics' percentile
+    # ranks (within sector if by_sector), over the metrics a row has.
+    def composite(self, weights, by_sector=False):
+        weights = {metric: float(weight) for metric, weight in (weights or {}).items() if metric in self.metrics and weight > 0}
+        if not weights:
+            weights = {metric: 1.0 for metric in self.metrics}
+        key = (COMPOSITE, by_sector, tuple(sorted(weights.items())))
+        with self.lock:
+            if key in self.composites:
+                self.composites.move_to_end(key)
+                return key
+            percentiles = self.sector_percentiles if by_sector else self.percentiles
+            total = np.zeros(self.size)
+            weight_total = np.zeros(self.size)
+            for metric, weight in weights.items():
+                valid = np.isfinite(percentiles[metric])
+                total += np.where(valid, percentiles[metric], 0.0) * weight
+                weight_total += valid * weight
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score = np.where(weight_total > 0, total / weight_total, np.nan)
+            self.add_ranking(key, score)
+            self.composites[key] = score
+            while len(self.composites) > COMPOSITE_CACHE_SIZE:
+                self.drop_ranking(self.composites.popitem(last=False)[0])
+        return key
+
+    # Function to forget the percentiles and orderings of an evicted ranking
+    def drop_ranking(self, name):
+        for rankings in (self.percentiles, self.sector_percentiles, self.orders, self.sector_orders):
+            rankings.pop(name, None)
+
+    # Function to resolve a rank metric (or the composite score) to a ranking name
+    def ranking(self, metric, by_sector=False, weights=None):
+        if metric == COMPOSITE:
+            return self.composite(weights, by_sector)
+        if metric not in self.orders:
+            raise KeyError(f"No ranks for {metric}")
+        return metric
+
+    # Function to take the first `count(n)` rows of the ordering, globally or
+    # per sector, where n is the number of ranked rows in that scope
+    def take(self, name, count, by_sector=False):
+        if not by_sector:
+            order = self.orders[name]
+            return order[:count(len(order))]
+        order, bounds = self.sector_orders[name]
+        slices = [
+            order[start:start + count(end - start)]
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        return np.concatenate(slices) if slices else np.array([], dtype=int)
+
+    # Function to get the row positions of the best k rows (per sector if by_sector)
+    def top_k(self, metric, k, by_sector=False, weights=None):
+        with self.lock:
+            return self.take(self.ranking(metric, by_sector, weights), lambda n: min(int(k), n), by_sector)
+
+    # Function to get the row positions of the best `percent` % of rows (per sector if by_sector)
+    def top_percent(self, metric, percent, by_sector=False, weights=None):
+        with self.lock:
+            return self.take(self.ranking(metric, by_sector, weights), lambda n: math.ceil(n * percent / 100), by_sector)
+
+    # Function to select rows by rank and return them with their rank columns.
+    # mode is 'Top K' (value = k) or 'Top Percentile' (value = percent).
+    def select(self, mode, metric, value, by_sector=False, weights=None):
+        with self.lock:
+            if mode == 'Top K':
+                rows = self.top_k(metric, value, by_sector, weights)
+            else:
+                rows = self.top_percent(metric, value, by_sector, weights)
+            name = self.ranking(metric, by_sector, weights)
+            percentiles = self.sector_percentiles[name] if by_sector else self.percentiles[name]
+            composite = self.composites.get(name)
+
+        result = self.df.iloc[rows].copy()
+        if composite is not None:
+            result[COMPOSITE] = composite[rows]
+        result['Percentile Rank'] = percentiles[rows]
+        result['Rank'] = np.concatenate([np.arange(1, len(group) + 1) for group in self.groups(rows, by_sector)]) if len(rows) else []
+        return result.reset_index(drop=True)
+
+    # Function to split selected rows (already in rank order) into their rank groups
+    def groups(self, rows, by_sector):
+        if not by_sector:
+            return [rows]
+        codes = self.sector_codes[rows]
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        return np.split(rows, boundaries)
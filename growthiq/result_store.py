@@ -0,0 +1,78 @@
+# result_store.py
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Number of screening results kept in memory and the optional spill directory
+RESULT_STORE_SIZE = int(os.environ.get('GROWTHIQ_RESULT_STORE_SIZE', 32))
+RESULT_SPILL_DIR = os.environ.get('GROWTHIQ_RESULT_SPILL_DIR')
+
+
+# In-memory store of screening results keyed by the screening parameters and
+# the version of the index data they were computed from. Sessions that screen
+# with the same parameters share one entry; the least recently used entries
+# are evicted (and written to spill_dir as JSON records, if configured).
+class ResultStore:
+    def __init__(self, max_entries=RESULT_STORE_SIZE, spill_dir=RESULT_SPILL_DIR):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # Function to build a stable key from the screening parameters and data version
+    @staticmethod
+    def make_key(params, data_version):
+        payload = json.dumps({'params': params, 'data_version': data_version}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.json")
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        # Fall back to a spilled copy and promote it back into memory
+        if self.spill_dir and os.path.exists(self.spill_path(key)):
+            try:
+                df = pd.read_json(self.spill_path(key), orient='records')
+            except ValueError as e:
+                logging.warning(f"Could not read spilled result {key}: {e}")
+                return None
+            self.put(key, df)
+            return df
+        return None
+
+    def put(self, key, df):
+        with self.lock:
+            self.entries[key] = df
+            self.entries.move_to_end(key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False))
+
+        for evicted_key, evicted_df in evicted:
+            self.spill(evicted_key, evicted_df)
+
+    def spill(self, key, df):
+        if not self.spill_dir or os.path.exists(self.spill_path(key)):
+            return
+        tmp_path = f"{self.spill_path(key)}.tmp"
+        try:
+            df.to_json(tmp_path, orient='records')
+            os.replace(tmp_path, self.spill_path(key))
+        except OSError as e:
+            logging.warning(f"Could not spill result {key} to {self.spill_dir}: {e}")
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
@@ -0,0 +1,517 @@
+# screening.py
+import logging
+import os
+import streamlit as st
+import pandas as pd
+
+# requests, pandas_ta and the price provider are imported on first use to keep
+# startup and cold imports of this module cheap
+
+
+# Location of the pre-fetched data files (e.g. a local range_server.py for testing)
+DATA_BASE_URL = os.environ.get('GROWTHIQ_DATA_URL', "https://stocktickerdata.blob.core.windows.net/stocktickerdata").rstrip('/')
+
+# Map index name to corresponding pre-fetched data file
+index_file_map = {
+    "S&P500 Index": f"{DATA_BASE_URL}/s&p500_index_data.json",
+    "NASDAQ Composite": f"{DATA_BASE_URL}/nasdaq_composite_data.json",
+    "Dow Jones Industrial Index": f"{DATA_BASE_URL}/dow_jones_industrial_index_data.json"
+}
+
+# Seconds a data version is trusted before the index file is checked again
+DATA_VERSION_TTL = int(os.environ.get('GROWTHIQ_DATA_VERSION_TTL', 60))
+
+# Seconds the S&P 500 benchmark is reused before it is fetched again
+BENCHMARK_TTL = int(os.environ.get('GROWTHIQ_BENCHMARK_TTL', 3600))
+
+# Ticker lists up to this size are read from the per-ticker block blob with
+# HTTP Range requests instead of downloading the whole index file
+RANGED_READ_MAX_TICKERS = int(os.environ.get('GROWTHIQ_RANGED_READ_MAX_TICKERS', 50))
+
+# (index, growth type, data version) keys whose full-index metrics this process
+# has computed, so small screens reuse them instead of issuing ranged reads
+loaded_index_metrics = set()
+
+
+# Function to fetch JSON data from a URL (Azure Blob URL). data_version only
+# keys the cache, so a re-uploaded file is downloaded again.
+@st.cache_data(show_spinner=True, max_entries=6)
+def fetch_data_from_azure_blob(url, data_version=None):
+    import requests
+
+    try:
+        response = requests.get(url)
+        response.raise_for_status()  # Check if the request was successful (status code 200)
+        return response.json()  # Parse the JSON response
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching data: {e}")
+        return None
+
+# Function to get the version (ETag or Last-Modified) of a pre-fetched index file,
+# so results computed from an older upload are never mistaken for current ones
+@st.cache_data(show_spinner=False, ttl=DATA_VERSION_TTL)
+def get_data_version(index_name):
+    import requests
+
+    url = index_file_map.get(index_name)
+    if not url:
+        return 'unversioned'
+    try:
+        response = requests.head(url, timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logging.warning(f"Could not get data version for {index_name}: {e}")
+        return 'unversioned'
+    return response.headers.get('ETag') or response.headers.get('Last-Modified') or 'unversioned'
+
+# Function to get tickers for the selected market index
+@st.cache_data(show_spinner=False)
+def get_tickers(market_index):
+    if market_index == 'S&P500 Index':
+        comp_list = pd.read_html('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies')[0]['Symbol'].tolist()
+        print(comp_list)
+        return comp_list
+    elif market_index == 'Dow Jones Industrial Index':
+        comp_list = pd.read_html('https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average')[1]['Symbol'].tolist()
+        print("Dow Jones Industrial Companies")
+        print(comp_list)
+        return comp_list
+    elif market_index == 'NASDAQ Composite':
+        # For NASDAQ Composite, we'll use a sample due to the large number of tickers
+        comp_list = pd.read_csv(os.path.join(os.path.dirname(__file__), "nasdaq_components.csv"))['Symbol'].to_list()
+        print(comp_list)
+        return comp_list
+    else:
+        return []
+
+# Function to calculate QoQ and YoY growth
+def calculate_growth(series):
+    series = series.sort_index()
+    qoQ_growth = series.pct_change(periods=1) * 100  # Quarter over Quarter
+    yoY_growth = series.pct_change(periods=4) * 100  # Year over Year
+    return qoQ_growth, yoY_growth
+
+# Function to calculate relative strength from data
+def calculate_relative_strength_from_data(historical_data, benchmark_data=None):
+    # If benchmark data is not provided, fetch S&P 500 data
+    if benchmark_data is None:
+        benchmark_data = fetch_benchmark_close()
+    
+    from backtest import to_trading_days
+
+    # Align on trading days: dates may be timezone-aware (exchange time) or naive
+    stock_data = pd.Series(historical_data['Close'])
+    stock_data.index = to_trading_days(stock_data.index.to_series()).to_numpy()
+    benchmark_data = pd.Series(benchmark_data.to_numpy(), index=to_trading_days(benchmark_data.index.to_series()).to_numpy())
+    stock_data, benchmark_data = stock_data.groupby(level=0).last().align(benchmark_data.groupby(level=0).last(), join='inner', axis=0)
+    if len(stock_data) < 2:
+        return None
+
+    # Calculate cumulative returns
+    stock_return = (stock_data.iloc[-1] / stock_data.iloc[0]) - 1
+    benchmark_return = (benchmark_data.iloc[-1] / benchmark_data.iloc[0]) - 1
+    # Calculate relative strength
+    relative_strength = (stock_return - benchmark_return) * 100  # In percentage
+    return relative_strength
+
+# Function to fetch the S&P 500 benchmark once per computation instead of once
+# per ticker. It is refreshed with each data version and after BENCHMARK_TTL.
+@st.cache_data(show_spinner=False, ttl=BENCHMARK_TTL, max_entries=6)
+def fetch_benchmark_close(data_version=None):
+    from providers import get_provider
+
+    benchmark_data = get_provider().history('^GSPC', period='1y')
+    if benchmark_data is None or benchmark_data.empty:
+        logging.warning("No S&P 500 benchmark data available")
+        return pd.Series(dtype=float)
+    return pd.Series(benchmark_data['Close'])
+
+# Function to fetch the per-ticker block index of a pre-fetched index file.
+# Returns None when the index has no block blob, so callers fall back to the full file.
+@st.cache_data(show_spinner=False)
+def fetch_block_index(index_name, data_version=None):
+    import requests
+    from blocks import block_locations
+
+    data_file_url = index_file_map.get(index_name)
+    if not data_file_url:
+        return None
+    try:
+        response = requests.get(block_locations(data_file_url)[1], timeout=30)
+        response.raise_for_status()
+        return response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.warning(f"No block index for {index_name}, reading the full data file: {e}")
+        return None
+
+# Function to fetch the pre-fetched data of only the given tickers.
+# Returns None when the blocks cannot be read, so callers fall back to the full file.
+@st.cache_data(show_spinner=True)
+def fetch_ticker_data_from_blocks(index_name, tickers, data_version=None):
+    import zlib
+    import requests
+    from blocks import block_locations, fetch_ticker_blocks
+
+    block_index = fetch_block_index(index_name, data_version)
+    if block_index is None:
+        return None
+    blob_url = block_locations(index_file_map[index_name])[0]
+    try:
+        return fetch_ticker_blocks(blob_url, block_index, tickers)
+    except (requests.exceptions.RequestException, OSError, EOFError, zlib.error, RuntimeError, ValueError) as e:
+        logging.warning(f"Could not read the ticker blocks of {index_name}, reading the full data file: {e}")
+        return None
+
+# Function to compute per-ticker metrics for every ticker of a pre-fetched index.
+# The result does not depend on the screening thresholds, so it is computed once
+# per index, growth type and data version and shared by every screening run (and the warm-up).
+@st.cache_data(show_spinner=True, max_entries=12)
+def compute_index_metrics(index_name, growth_type, data_version=None):
+    # Get the appropriate file for the selected index
+    data_file_url = index_file_map.get(index_name)
+
+    if not data_file_url:
+        st.error(f"No pre-fetched data file found for {index_name}.")
+        return pd.DataFrame()
+
+    # Fetch data from the URL
+    data_list = fetch_data_from_azure_blob(data_file_url, data_version)
+
+    if not data_list:
+        st.error("No data available after fetching.")
+        return pd.DataFrame()
+
+    df = compute_metrics(data_list, growth_type, data_version)
+    loaded_index_metrics.add((index_name, growth_type, data_version))
+    return df
+
+# Function to compute per-ticker metrics for a small ticker list, reading only
+# their blocks; falls back to the full index when no block blob is published
+@st.cache_data(show_spinner=True)
+def compute_ticker_metrics(index_name, tickers, growth_type, data_version=None):
+    data_list = fetch_ticker_data_from_blocks(index_name, tickers, data_version)
+    if data_list is None:
+        return select_index_metrics(index_name, tickers, growth_type, data_version)
+    return compute_metrics(data_list, growth_type, data_version)
+
+# Function to take the metrics of `tickers` from the metrics of the whole index
+def select_index_metrics(index_name, tickers, growth_type, data_version=None):
+    df = compute_index_metrics(index_name, growth_type, data_version)
+    return df[df['Ticker'].isin(tickers)].reset_index(drop=True) if not df.empty else df
+
+# Function to forget the cached download and metrics of an index version after a
+# failure (they are cached as None or empty), so the next attempt fetches again
+def clear_index_caches(index_name, tickers, growth_type, data_version=None):
+    get_data_version.clear(index_name)
+    fetch_benchmark_close.clear(data_version)
+    fetch_data_from_azure_blob.clear(index_file_map.get(index_name), data_version)
+    fetch_block_index.clear(index_name, data_version)
+    fetch_ticker_data_from_blocks.clear(index_name, list(tickers), data_version)
+    compute_index_metrics.clear(index_name, growth_type, data_version)
+    loaded_index_metrics.discard((index_name, growth_type, data_version))
+    compute_ticker_metrics.clear(index_name, list(tickers), growth_type, data_version)
+
+# Function to compute the metrics a screen of `tickers` needs: small lists use
+# ranged reads of their blocks unless the whole index is already loaded (e.g. by
+# the warm-up), larger ones the cached metrics of the whole index
+def compute_screen_metrics(index_name, tickers, growth_type, data_version=None):
+    if (index_name, growth_type, data_version) in loaded_index_metrics:
+        return select_index_metrics(index_name, tickers, growth_type, data_version)
+    if len(tickers) <= RANGED_READ_MAX_TICKERS:
+        return compute_ticker_metrics(index_name, list(tickers), growth_type, data_version)
+    return compute_index_metrics(index_name, growth_type, data_version)
+
+# Function to compute the per-ticker metrics of pre-fetched ticker records
+def compute_metrics(data_list, growth_type, data_version=None):
+    import pandas_ta as ta
+
+    benchmark_data = fetch_benchmark_close(data_version)
+
+    results = []
+    for data in data_list:
+        ticker = data['Ticker']
+        company_name = data['Info'].get('longName', data['Ticker'])
+        
+        # Convert financial data back to DataFrames
+        try:
+            financials = pd.DataFrame(data['Financials'])[['Total Revenue', 'Net Income']].dropna()
+        except Exception as e:
+            logging.warning(f"Ticker {ticker} for {company_name} error")
+            logging.warning(f"financial data Total Revenue or Net Income is not available")
+            continue
+        try:
+            cashflow = pd.DataFrame(data['Cashflow'])[['Free Cash Flow']].dropna()
+        except Exception as e:
+            logging.warning(f"Ticker {ticker} for {company_name} error")
+            logging.warning("financial data Cashflow is not available")
+            continue
+            
+        # Convert index to datetime
+        financials.index = pd.to_datetime(financials.index, errors='coerce')
+        cashflow.index = pd.to_datetime(cashflow.index, errors='coerce')
+
+        # Drop rows with NaT in index
+        financials.dropna(inplace=True)
+        cashflow.dropna(inplace=True)
+
+        # Extract required metrics
+        revenue = financials['Total Revenue']
+        net_income = financials['Net Income']
+        free_cash_flow = cashflow['Free Cash Flow']
+
+        # Skip companies with negative or zero revenue and net income
+        if revenue.iloc[-1] <= 0 or net_income.iloc[-1] <= 0:
+            logging.warning(f"Ticker {ticker} for {company_name} has non-positive revenue or net income. Skipping.")
+            continue
+
+        # Calculate growth rates (QoQ or YoY)
+        revenue_qoq, revenue_yoy = calculate_growth(revenue)
+        net_income_qoq, net_income_yoy = calculate_growth(net_income)
+        fcf_qoq, fcf_yoy = calculate_growth(free_cash_flow)
+           # Select the growth rate based on growth type
+        if growth_type == 'QoQ':
+            revenue_growth = revenue_qoq
+            net_income_growth = net_income_qoq
+            fcf_growth = fcf_qoq
+        else:
+            revenue_growth = revenue_yoy
+            net_income_growth = net_income_yoy
+            fcf_growth = fcf_yoy
+
+        #print(revenue_growth, net_income_growth, fcf_growth)
+
+        # Get the latest growth values
+        revenue_growth_latest = revenue_growth.iloc[-1] if not revenue_growth.empty else None
+        net_income_growth_latest = net_income_growth.iloc[-1] if not net_income_growth.empty else None
+        fcf_growth_latest = fcf_growth.iloc[-1] if not fcf_growth.empty else None
+        # Check if growth values are not None
+        if revenue_growth_latest is None or net_income_growth_latest is None or fcf_growth_latest is None:
+            logging.warning(f"Growth data for {ticker} is incomplete. Skipping.")
+            continue
+
+        # Fetch historical data
+        # Fix the order of arguments and handle DataFrame construction properly
+        historical_data = pd.DataFrame(data['HistoricalData']).set_index('Date')[['Close', 'Volume']].dropna()
+        historical_data.index = pd.to_datetime(historical_data.index, utc=True)  # Ensure it's datetime with UTC
+        #print("historical data ", historical_data)
+        if historical_data.empty:
+            logging.warning(f"No historical data for {ticker}. Skipping.")
+            continue
+
+        # Calculate relative strength
+        relative_strength = calculate_relative_strength_from_data(historical_data, benchmark_data)
+        if relative_strength is None:
+            logging.warning(f"No price history of {ticker} overlaps the benchmark. Skipping.")
+            continue
+        # Extract additional metrics from the pre-fetched data
+
+        pe_ratio = data['Info'].get('trailingPE')
+        debt_to_equity = data['Info'].get('debtToEquity')
+
+        roe = data['Info'].get('returnOnEquity') * 100 if data['Info'].get('returnOnEquity') else None
+        dividend_yield = data['Info'].get('dividendYield') * 100 if data['Info'].get('dividendYield') else None
+        
+        market_cap = data['Info'].get('marketCap', 'Unknown')
+        total_cash = data['Info'].get('totalCash', 'Unknown')
+        sector = data['Info'].get('sector', 'Unknown')  # Default to 'Unknown' if the sector is not available
+        
+        # Calculate RSI and SMAs
+        historical_data['RSI'] = ta.rsi(historical_data['Close'])
+        historical_data['SMA_20'] = ta.sma(historical_data['Close'], length=20)
+        historical_data['SMA_50'] = ta.sma(historical_data['Close'], length=50)
+        historical_data['SMA_200'] = ta.sma(historical_data['Close'], length=200)
+
+        # Get latest price, RSI and SMAs
+        latest_price = historical_data['Close'].iloc[-1]
+        rsi = historical_data['RSI'].iloc[-1]
+        sma_20 = historical_data['SMA_20'].iloc[-1]
+        sma_50 = historical_data['SMA_50'].iloc[-1]
+        sma_200 = historical_data['SMA_200'].iloc[-1]
+
+        # Check if price is above SMAs
+        price_above_sma20_flag = latest_price > sma_20 if not pd.isna(sma_20) else False
+        price_above_sma50_flag = latest_price > sma_50 if not pd.isna(sma_50) else False
+        price_above_sma200_flag = latest_price > sma_200 if not pd.isna(sma_200) else False
+
+        results.append({
+            'Ticker': ticker,
+            'Company Name': company_name,
+            'Revenue Growth': revenue_growth_latest,
+            'Net Income Growth': net_income_growth_latest,
+            'Free Cash Flow Growth': fcf_growth_latest,
+            'Relative Strength': relative_strength,
+            'P/E Ratio': pe_ratio,
+            'Debt-to-Equity': debt_to_equity,
+            'ROE': roe,
+            'Market Cap': market_cap,
+            'Sector': sector,
+            'RSI': rsi,
+            'Price Above SMA 20': price_above_sma20_flag,
+            'Price Above SMA 50': price_above_sma50_flag,
+            'Price Above SMA 200': price_above_sma200_flag
+        })
+
+    df = pd.DataFrame(results)
+    if df.empty:
+        return df
+
+    # Add TTM, CAGR, acceleration and streak metrics, computed for all tickers at once
+    from fundamentals import compute_trend_metrics
+
+    return df.join(compute_trend_metrics(data_list, growth_type), on='Ticker')
+
+# Function to get the CAGR horizons the metrics of a screen have values for,
+# from the (cached) metrics the screen has already loaded
+def get_cagr_horizons(index_name, tickers, growth_type, data_version=None):
+    from fundamentals import available_cagr_horizons
+
+    return available_cagr_horizons(compute_screen_metrics(index_name, tickers, growth_type, data_version))
+
+# Function to fetch and process pre-fetched data
+@st.cache_data(show_spinner=True)
+def fetch_and_process_data(
+    tickers,
+    growth_type,
+    revenue_growth_threshold,
+    net_income_growth_threshold,
+    fcf_growth_threshold,
+    rs_threshold,
+    filter_logic,
+    index_name="S&P500 Index",  # You can choose between S&P500, NASDAQ, or Dow Jones
+    trend_criteria=None,
+    data_version=None
+):
+    df = compute_screen_metrics(index_name, tickers, growth_type, data_version)
+
+    # Filter the data for the selected tickers
+    if not df.empty:
+        df = df[df['Ticker'].isin(tickers)].reset_index(drop=True)
+
+    if df.empty:
+        st.error("No data available after processing. Please check the data and try again.")
+        return df  # Return the empty DataFrame
+
+    # Fill missing values
+    df['Revenue Growth'] = df['Revenue Growth'].dropna()
+    df['Net Income Growth'] = df['Net Income Growth'].dropna()
+    df['Free Cash Flow Growth'] = df['Free Cash Flow Growth'].dropna()
+    df['Relative Strength'] = df['Relative Strength'].dropna()
+
+    # Apply initial screening thresholds
+    conditions = []
+
+    if revenue_growth_threshold is not None:
+        conditions.append(df['Revenue Growth'] >= revenue_growth_threshold)
+
+    if net_income_growth_threshold is not None:
+        conditions.append(df['Net Income Growth'] >= net_income_growth_threshold)
+
+    if fcf_growth_threshold is not None:
+        conditions.append(df['Free Cash Flow Growth'] >= fcf_growth_threshold)
+
+    # Apply relative strength threshold
+    conditions.append(df['Relative Strength'] >= rs_threshold)
+
+    # Combine conditions based on selected logic
+    if filter_logic == 'ALL':
+        combined_condition = pd.Series(True, index=df.index)
+        for condition in conditions:
+            combined_condition &= condition
+    else:
+        combined_condition = pd.Series(False, index=df.index)
+        for condition in conditions:
+            combined_condition |= condition
+
+    # The fundamental trend criteria that are switched on must all hold as well,
+    # whichever logic combines the thresholds
+    from fundamentals import trend_conditions
+
+    for condition in trend_conditions(df, trend_criteria):
+        combined_condition &= condition
+
+    # Apply combined condition
+    screened_df = df[combined_condition]
+
+    return screened_df
+
+# Function to build the rank index of a screen's ticker universe, once per
+# metrics computation and version of the index data; shared by every session
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_rank_index(index_name, tickers, growth_type, data_version):
+    from rank_index import RankIndex
+
+    df = compute_screen_metrics(index_name, tickers, growth_type, data_version)
+    if not df.empty:
+        df = df[df['Ticker'].isin(tickers)]
+    return RankIndex(df)
+
+# Function to screen by cross-sectional rank instead of absolute thresholds.
+# rank_criteria: {'mode', 'metric', 'value', 'by_sector', 'weights'}
+def fetch_and_rank_data(tickers, growth_type, rank_criteria, index_name="S&P500 Index", data_version=None):
+    rank_index = get_rank_index(index_name, tuple(tickers), growth_type, data_version)
+    if rank_index.size == 0:
+        st.error("No data available after processing. Please check the data and try again.")
+        return rank_index.df
+    return rank_index.select(
+        rank_criteria['mode'],
+        rank_criteria['metric'],
+        rank_criteria['value'],
+        rank_criteria.get('by_sector', False),
+        rank_criteria.get('weights'),
+    )
+
+# Function to backtest the screen on the pre-fetched data of an index
+@st.cache_data(show_spinner=True)
+def run_index_backtest(
+    index_name,
+    growth_type,
+    revenue_growth_threshold,
+    net_income_growth_threshold,
+    fcf_growth_threshold,
+    rs_threshold,
+    filter_logic,
+    horizon_days=63,
+    data_version=None
+):
+    from backtest import build_fundamental_panels, build_price_panel, run_backtest
+
+    data_list = fetch_data_from_azure_blob(index_file_map.get(index_name), data_version)
+    if not data_list:
+        st.error("No data available after fetching.")
+        return None, None
+
+    summary, baskets = run_backtest(
+        build_fundamental_panels(data_list),
+        build_price_panel(data_list),
+        fetch_benchmark_close(data_version),
+        growth_type=growth_type,
+        revenue_growth_threshold=revenue_growth_threshold,
+        net_income_growth_threshold=net_income_growth_threshold,
+        fcf_growth_threshold=fcf_growth_threshold,
+        rs_threshold=rs_threshold,
+        filter_logic=filter_logic,
+        horizon_days=horizon_days,
+    )
+    return summary, baskets
+
+# Function to fetch the pre-fetched records of a ticker list: their blocks for
+# small lists, otherwise the matching records of the whole index file
+def fetch_screen_records(index_name, tickers, data_version=None):
+    if len(tickers) <= RANGED_READ_MAX_TICKERS:
+        data_list = fetch_ticker_data_from_blocks(index_name, list(tickers), data_version)
+        if data_list is not None:
+            return data_list
+    wanted = set(tickers)
+    return [data for data in fetch_data_from_azure_blob(index_file_map.get(index_name), data_version) or [] if data['Ticker'] in wanted]
+
+# Function to compute correlation, rolling beta and clustering analytics of a
+# screened basket, cached per ticker set and version of the index data
+@st.cache_data(show_spinner=True)
+def compute_basket_analytics(index_name, tickers, data_version, beta_window=63):
+    from correlation import basket_analytics
+
+    data_list = fetch_screen_records(index_name, tickers, data_version)
+    if not data_list:
+        st.error("No price data available for the screened tickers.")
+        return None
+    return basket_analytics(data_list, fetch_benchmark_close(data_version), beta_window)
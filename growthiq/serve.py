@@ -0,0 +1,15 @@
+# serve.py
+import os
+import sys
+
+from warmup import start_warmup
+
+# Launch the dashboard and warm the index caches as soon as the server boots,
+# instead of on the first session
+if __name__ == "__main__":
+    from streamlit.web import cli as stcli
+
+    start_warmup(wait_for_runtime=True)
+    dashboard = os.path.join(os.path.dirname(os.path.abspath(__file__)), "growth_dashboard.py")
+    sys.argv = ["streamlit", "run", dashboard] + sys.argv[1:]
+    sys.exit(stcli.main())
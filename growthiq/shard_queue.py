@@ -0,0 +1,252 @@
+# shard_queue.py
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+# Seconds a worker owns a shard before it can be re-leased to another worker
+LEASE_SECONDS = int(os.environ.get('GROWTHIQ_SHARD_LEASE_SECONDS', 300))
+
+# Attempts after which a shard is marked failed instead of being re-leased
+MAX_ATTEMPTS = int(os.environ.get('GROWTHIQ_SHARD_MAX_ATTEMPTS', 5))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY,
+    index_name TEXT NOT NULL,
+    shard_no INTEGER NOT NULL,
+    tickers TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    output TEXT,
+    error TEXT,
+    updated_at REAL,
+    UNIQUE (index_name, shard_no)
+)
+"""
+
+
+# Function to split a ticker list into shards of at most shard_size tickers
+def make_shards(tickers, shard_size):
+    tickers = list(dict.fromkeys(tickers))
+    return [tickers[start:start + shard_size] for start in range(0, len(tickers), shard_size)]
+
+
+# Function to name the current worker (host and process)
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# Durable work queue of prefetch shards in a SQLite file. Workers claim shards
+# with time-limited leases; a shard whose worker failed or stalled goes back to
+# the queue once its lease expires. Completing a shard only succeeds for the
+# worker holding the current lease, so a stalled worker cannot overwrite the
+# state of a shard that was re-leased to someone else.
+class ShardQueue:
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.local = threading.local()
+        with self.transaction() as conn:
+            conn.execute(SCHEMA)
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self.local.conn = conn
+        return conn
+
+    # Run statements in one write transaction, taking the write lock up front
+    # so two workers never claim the same shard
+    def transaction(self):
+        queue = self
+
+        class Transaction:
+            def __enter__(self):
+                self.conn = queue.connect()
+                self.conn.execute('BEGIN IMMEDIATE')
+                return self.conn
+
+            def __exit__(self, exc_type, exc, tb):
+                self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+                return False
+
+        return Transaction()
+
+    # Function to (re)create the shards of an index; resets its previous run
+    def enqueue(self, index_name, shards):
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM shards WHERE index_name = ?', (index_name,))
+            conn.executemany(
+                'INSERT INTO shards (index_name, shard_no, tickers, updated_at) VALUES (?, ?, ?, ?)',
+                [(index_name, shard_no, json.dumps(tickers), now) for shard_no, tickers in enumerate(shards)],
+            )
+        logging.info(f"Queued {len(shards)} shards of {index_name}")
+
+    # Function to lease the next pending or expired shard; returns None when nothing is claimable
+    def claim(self, worker):
+        now = time.time()
+        with self.transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM shards WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                    "ORDER BY attempts, id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row['status'] == 'leased':
+                    logging.warning(
+                        f"Lease of {row['index_name']} shard {row['shard_no']} held by {row['worker']} expired"
+                    )
+                if row['attempts'] < self.max_attempts:
+                    break
+                # A stalled shard that used up its attempts is given up on
+                conn.execute(
+                    "UPDATE shards SET status = 'failed', worker = NULL, lease_expires = NULL, updated_at = ? WHERE id = ?",
+                    (now, row['id']),
+                )
+                logging.error(f"{row['index_name']} shard {row['shard_no']} failed after {row['attempts']} attempts")
+            conn.execute(
+                "UPDATE shards SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row['id']),
+            )
+        return {
+            'id': row['id'],
+            'index_name': row['index_name'],
+            'shard_no': row['shard_no'],
+            'tickers': json.loads(row['tickers']),
+            'attempt': row['attempts'] + 1,
+        }
+
+    # Function to extend a lease; returns False if the worker no longer holds it
+    def renew(self, shard_id, worker):
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (now + self.lease_seconds, now, shard_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, shard_id, worker, output):
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET status = 'done', output = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (output, time.time(), shard_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    # Function to release a failed shard back to the queue, or mark it failed
+    # once it has used up its attempts
+    def fail(self, shard_id, worker, error):
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, str(error), time.time(), shard_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    # Function to count shards per index and status
+    def status(self):
+        rows = self.connect().execute(
+            'SELECT index_name, status, COUNT(*) AS shards FROM shards GROUP BY index_name, status ORDER BY index_name'
+        ).fetchall()
+        summary = {}
+        for row in rows:
+            summary.setdefault(row['index_name'], {})[row['status']] = row['shards']
+        return summary
+
+    # Function to check whether any shard is still pending or leased
+    def is_drained(self):
+        row = self.connect().execute(
+            "SELECT COUNT(*) FROM shards WHERE status IN ('pending', 'leased')"
+        ).fetchone()
+        return row[0] == 0
+
+    def shards(self, index_name):
+        rows = self.connect().execute(
+            'SELECT * FROM shards WHERE index_name = ? ORDER BY shard_no', (index_name,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def index_names(self):
+        return [row[0] for row in self.connect().execute('SELECT DISTINCT index_name FROM shards ORDER BY index_name')]
+
+
+# Keeps renewing a shard lease in the background while the shard is processed
+class LeaseKeeper:
+    def __init__(self, queue, shard_id, worker):
+        self.queue = queue
+        self.shard_id = shard_id
+        self.worker = worker
+        self.stopped = threading.Event()
+        self.lost = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        interval = max(self.queue.lease_seconds / 3, 1)
+        while not self.stopped.wait(interval):
+            if not self.queue.renew(self.shard_id, self.worker):
+                self.lost = True
+                logging.warning(f"{self.worker} lost the lease of shard {self.shard_id}")
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+
+# Function to process shards until the queue is drained. process_shard(shard)
+# fetches one shard and returns the location of its output. Returns the number
+# of shards this worker completed.
+def run_worker(queue, process_shard, worker=None, poll_seconds=5):
+    worker = worker or default_worker_id()
+    completed = 0
+    while True:
+        shard = queue.claim(worker)
+        if shard is None:
+            if queue.is_drained():
+                break
+            # Other workers hold the remaining leases; wait in case one of them stalls
+            time.sleep(poll_seconds)
+            continue
+
+        name = f"{shard['index_name']} shard {shard['shard_no']} (attempt {shard['attempt']})"
+        logging.info(f"{worker} processing {name} with {len(shard['tickers'])} tickers")
+        start = time.perf_counter()
+        try:
+            with LeaseKeeper(queue, shard['id'], worker):
+                output = process_shard(shard)
+        except Exception as e:
+            logging.error(f"{worker} failed {name}: {e}")
+            queue.fail(shard['id'], worker, e)
+            continue
+
+        if queue.complete(shard['id'], worker, output):
+            completed += 1
+            logging.info(f"{worker} completed {name} in {time.perf_counter() - start:.1f}s")
+        else:
+            logging.warning(f"{worker} finished {name} after its lease was taken over; result discarded")
+
+    logging.info(f"{worker} done: {completed} shards completed")
+    return completed
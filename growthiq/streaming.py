@@ -0,0 +1,257 @@
+# streaming.py
+import argparse
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+
+import pandas as pd
+
+# One price update for one ticker
+Bar = namedtuple('Bar', ['ticker', 'time', 'close', 'volume'])
+
+SMA_LENGTHS = [20, 50, 200]
+
+
+# Simple moving average with a running sum over a fixed window
+class RollingSMA:
+    def __init__(self, length):
+        self.length = length
+        self.window = deque()
+        self.total = 0.0
+
+    def update(self, value):
+        self.window.append(value)
+        self.total += value
+        if len(self.window) > self.length:
+            self.total -= self.window.popleft()
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.length if len(self.window) == self.length else math.nan
+
+
+# Exponential moving average seeded with the SMA of the first `length` values
+# (the pandas_ta ema convention)
+class RollingEMA:
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self.count = 0
+        self.seed_total = 0.0
+        self.value = math.nan
+
+    def update(self, value):
+        self.count += 1
+        if self.count < self.length:
+            self.seed_total += value
+        elif self.count == self.length:
+            self.value = (self.seed_total + value) / self.length
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+# Wilder's moving average as pandas_ta computes it (an adjusted ewm with
+# alpha = 1 / length), kept as a running weighted sum and weight total
+class RollingRMA:
+    def __init__(self, length):
+        self.length = length
+        self.decay = 1 - 1 / length
+        self.count = 0
+        self.weighted_sum = 0.0
+        self.weight_total = 0.0
+
+    def update(self, value):
+        self.count += 1
+        self.weighted_sum = self.decay * self.weighted_sum + value
+        self.weight_total = self.decay * self.weight_total + 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.weighted_sum / self.weight_total if self.count >= self.length else math.nan
+
+
+# Relative strength index from Wilder-smoothed gains and losses
+class RollingRSI:
+    def __init__(self, length=14):
+        self.gains = RollingRMA(length)
+        self.losses = RollingRMA(length)
+        self.previous = None
+        self.value = math.nan
+
+    def update(self, value):
+        if self.previous is not None:
+            change = value - self.previous
+            gain = self.gains.update(max(change, 0.0))
+            loss = self.losses.update(max(-change, 0.0))
+            total = gain + loss
+            self.value = 100 * gain / total if total else math.nan
+        self.previous = value
+        return self.value
+
+
+# MACD line, signal line and histogram from three rolling EMAs
+class RollingMACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = RollingEMA(fast)
+        self.slow = RollingEMA(slow)
+        self.signal = RollingEMA(signal)
+        self.macd = self.signal_value = self.histogram = math.nan
+
+    def update(self, value):
+        self.macd = self.fast.update(value) - self.slow.update(value)
+        if not math.isnan(self.macd):
+            self.signal_value = self.signal.update(self.macd)
+            self.histogram = self.macd - self.signal_value
+        return self.macd
+
+
+# Constant-time indicator state of one watchlist ticker
+class TickerState:
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.smas = {length: RollingSMA(length) for length in SMA_LENGTHS}
+        self.ema = RollingEMA(20)
+        self.rsi = RollingRSI(14)
+        self.macd = RollingMACD()
+
+    # Function to apply one close and return the new chart point
+    def update(self, time, close, volume=None):
+        sma_values = {length: sma.update(close) for length, sma in self.smas.items()}
+        point = {
+            'Date': time,
+            'Close': close,
+            'Volume': volume,
+            'EMA_20': self.ema.update(close),
+            'RSI': self.rsi.update(close),
+            'MACD': self.macd.update(close),
+            'MACD_Signal': self.macd.signal_value,
+            'MACD_Hist': self.macd.histogram,
+        }
+        for length, value in sma_values.items():
+            point[f'SMA_{length}'] = value
+            point[f'Price Above SMA {length}'] = close > value if not math.isnan(value) else False
+        return point
+
+    # Function to seed the indicators from historical closes before going live;
+    # returns the last `keep` points
+    def warm(self, historical_data, keep=1):
+        points = deque(maxlen=keep)
+        for time, close in historical_data['Close'].dropna().items():
+            points.append(self.update(time, float(close)))
+        return list(points)
+
+
+# Watchlist of tickers updated from a feed. update() returns the changed chart
+# point and whether any Price-Above-SMA flag flipped, so callers only redraw
+# what changed.
+class Watchlist:
+    def __init__(self, tickers):
+        self.states = {ticker: TickerState(ticker) for ticker in tickers}
+        self.latest = {}
+        self.updates = 0
+
+    # Function to seed every ticker from its history; returns the last
+    # `chart_points` points of chart_ticker to start its chart with
+    def warm(self, histories, chart_ticker=None, chart_points=120):
+        chart_history = []
+        for ticker, historical_data in histories.items():
+            if ticker in self.states:
+                points = self.states[ticker].warm(historical_data, chart_points if ticker == chart_ticker else 1)
+                if points:
+                    self.latest[ticker] = points[-1]
+                if ticker == chart_ticker:
+                    chart_history = points
+        return chart_history
+
+    def update(self, bar):
+        state = self.states.get(bar.ticker)
+        if state is None or not math.isfinite(bar.close):
+            return None, False
+        point = state.update(bar.time, bar.close, bar.volume)
+        previous = self.latest.get(bar.ticker)
+        flags_changed = previous is None or any(
+            point[f'Price Above SMA {length}'] != previous[f'Price Above SMA {length}'] for length in SMA_LENGTHS
+        )
+        self.latest[bar.ticker] = point
+        self.updates += 1
+        return point, flags_changed
+
+    # Function to summarize the latest indicators and flags per ticker
+    def snapshot(self):
+        columns = ['Close', 'RSI', 'MACD_Hist'] + [f'Price Above SMA {length}' for length in SMA_LENGTHS]
+        return pd.DataFrame.from_dict(self.latest, orient='index').reindex(columns=columns)
+
+
+# Interface of a live price feed: iterating yields Bars in time order
+class PriceFeed(ABC):
+    @abstractmethod
+    def __iter__(self):
+        pass
+
+
+# Simulated feed that replays historical bars of many tickers in time order,
+# optionally paced with a delay between bars
+class ReplayFeed(PriceFeed):
+    def __init__(self, histories, delay=0.0):
+        self.histories = histories
+        self.delay = delay
+
+    def __iter__(self):
+        frames = [
+            pd.DataFrame({
+                'ticker': ticker,
+                'time': historical_data.index,
+                'close': historical_data['Close'].to_numpy(dtype=float),
+                'volume': historical_data['Volume'].to_numpy() if 'Volume' in historical_data else None,
+            })
+            for ticker, historical_data in self.histories.items() if not historical_data.empty
+        ]
+        if not frames:
+            return
+        bars = pd.concat(frames, ignore_index=True).sort_values('time', kind='stable')
+        for row in bars.itertuples(index=False):
+            yield Bar(row.ticker, row.time, row.close, row.volume)
+            if self.delay:
+                time.sleep(self.delay)
+
+
+# Function to split histories into a warm-up part and the last `replay_bars` bars to replay
+def split_for_replay(histories, replay_bars):
+    warm = {ticker: history.iloc[:-replay_bars] for ticker, history in histories.items()}
+    replay = {ticker: history.iloc[-replay_bars:] for ticker, history in histories.items()}
+    return warm, replay
+
+
+FEEDS = {
+    'Replay (simulated)': ReplayFeed,
+}
+
+
+def main():
+    from providers import FakeProvider, fetch_price_history
+
+    parser = argparse.ArgumentParser(description="Measure watchlist update throughput on a simulated replay feed.")
+    parser.add_argument('--tickers', type=int, default=1000)
+    parser.add_argument('--bars', type=int, default=252, help="bars replayed per ticker")
+    args = parser.parse_args()
+
+    tickers = [f"SIM{i}" for i in range(args.tickers)]
+    histories, _ = fetch_price_history(tickers, FakeProvider(), period='2y')
+    warm, replay = split_for_replay(histories, args.bars)
+
+    watchlist = Watchlist(tickers)
+    watchlist.warm(warm)
+    bars = list(ReplayFeed(replay))
+    start = time.perf_counter()
+    for bar in bars:
+        watchlist.update(bar)
+    elapsed = time.perf_counter() - start
+    print(f"{len(bars)} updates across {len(tickers)} tickers in {elapsed:.2f}s ({len(bars) / elapsed:,.0f} updates/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# test_backtest.py
+import numpy as np
+import pandas as pd
+
+from backtest import FUNDAMENTAL_FIELDS, panel_growth, run_backtest, sma_at_rows
+
+
+# Function to build a small synthetic universe with missing quarters and prices
+def make_universe(n_tickers=12, n_quarters=12, seed=0):
+    rng = np.random.default_rng(seed)
+    tickers = [f'T{i}' for i in range(n_tickers)]
+    quarters = pd.period_range('2021Q1', periods=n_quarters, freq='Q')
+    fundamentals = {}
+    for name in FUNDAMENTAL_FIELDS:
+        values = rng.normal(100, 40, (n_quarters, n_tickers))
+        values[rng.random(values.shape) < 0.15] = np.nan
+        fundamentals[name] = pd.DataFrame(values, index=quarters, columns=tickers)
+
+    days = pd.bdate_range(quarters[0].start_time, quarters[-1].end_time.normalize())
+    prices = pd.DataFrame(
+        50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (len(days), n_tickers)), axis=0)), index=days, columns=tickers,
+    )
+    prices.iloc[:rng.integers(0, 300), 0] = np.nan
+    prices[prices.columns[1]] = prices[prices.columns[1]].mask(rng.random(len(days)) < 0.05)
+    benchmark = pd.Series(4000 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(days)))), index=days)
+    return fundamentals, prices, benchmark
+
+
+def test_panel_growth_matches_pct_change():
+    fundamentals, _, _ = make_universe()
+    panel = fundamentals['Revenue']
+    for periods in (1, 4):
+        expected = panel.pct_change(periods=periods, fill_method=None) * 100
+        np.testing.assert_allclose(panel_growth(panel.to_numpy(), periods), expected.to_numpy(), equal_nan=True)
+
+
+def test_sma_at_rows_matches_rolling_mean():
+    _, prices, _ = make_universe()
+    rows = np.array([0, 10, 199, 250, len(prices) - 1])
+    for length in (20, 200):
+        expected = prices.rolling(length).mean().to_numpy()[rows]
+        np.testing.assert_allclose(sma_at_rows(prices.to_numpy(), rows, length), expected, equal_nan=True)
+
+
+# Reference screen of one ticker at one as-of date, written per ticker with pandas
+def reference_passing(fundamentals, prices, benchmark, ticker, as_of, periods, threshold, logic, lag_days=45, lookback=252, staleness=2):
+    close = prices[ticker].ffill()
+    row = prices.index.searchsorted(as_of, side='right') - 1
+    if row < 0:
+        return False
+
+    growth, latest = {}, {}
+    for name in FUNDAMENTAL_FIELDS:
+        series = fundamentals[name][ticker]
+        available = series.index.to_timestamp(how='end').normalize() + pd.Timedelta(days=lag_days)
+        known = series[available <= as_of]
+        reported = known.dropna()
+        if reported.empty or (len(known) - 1) - known.index.get_loc(reported.index[-1]) > staleness:
+            return False
+        latest[name] = reported.iloc[-1]
+        growth[name] = (series.pct_change(periods=periods, fill_method=None) * 100).loc[reported.index[-1]]
+
+    first = close.first_valid_index()
+    if first is None:
+        return False
+    base = max(row - lookback, prices.index.get_loc(first))
+    if base >= row:
+        return False
+    bench = benchmark.reindex(prices.index).ffill()
+    relative_strength = ((close.iloc[row] / close.iloc[base] - 1) - (bench.iloc[row] / bench.iloc[base] - 1)) * 100
+
+    if not (latest['Revenue'] > 0 and latest['Net Income'] > 0 and np.isfinite(relative_strength)):
+        return False
+    if not all(np.isfinite(value) for value in growth.values()):
+        return False
+    conditions = [value >= threshold for value in growth.values()] + [relative_strength >= 0]
+    return all(conditions) if logic == 'ALL' else any(conditions)
+
+
+def test_run_backtest_matches_per_ticker_reference():
+    fundamentals, prices, benchmark = make_universe()
+    # Month ends, so some as-of dates fall inside the reporting lag of a quarter
+    as_of_dates = pd.date_range(prices.index[0], prices.index[-1], freq='M')
+    for growth_type, periods, threshold, logic in (('QoQ', 1, 10, 'ALL'), ('QoQ', 1, -20, 'ALL'), ('YoY', 4, -20, 'ALL'), ('YoY', 4, 30, 'ANY')):
+        _, baskets = run_backtest(
+            fundamentals, prices, benchmark, growth_type=growth_type, revenue_growth_threshold=threshold,
+            net_income_growth_threshold=threshold, fcf_growth_threshold=threshold, filter_logic=logic,
+            as_of_dates=as_of_dates,
+        )
+        for as_of in baskets.index:
+            for ticker in baskets.columns:
+                expected = reference_passing(fundamentals, prices, benchmark, ticker, as_of, periods, threshold, logic)
+                assert bool(baskets.loc[as_of, ticker]) == expected, (growth_type, threshold, logic, as_of, ticker)
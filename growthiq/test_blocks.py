@@ -0,0 +1,89 @@
+# test_blocks.py
+import functools
+import json
+import threading
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import screening
+from blocks import fetch_ticker_blocks, plan_ranges, write_block_file
+from range_server import make_server
+
+
+# Function to write an index file whose blocks are too large to share one range request
+def make_index(directory, n_tickers=30, seed=0):
+    rng = np.random.default_rng(seed)
+    data_list = [{'Ticker': f'T{i}', 'Close': rng.normal(100, 10, 10000).tolist()} for i in range(n_tickers)]
+    blob_file, index_file = write_block_file(data_list, str(directory / 'test_index_data.json'))
+    with open(index_file) as f:
+        block_index = json.load(f)
+    return data_list, blob_file, block_index
+
+
+@contextmanager
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# Plain static server that ignores Range headers and always answers 200
+class NoRangeHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def test_fetch_ticker_blocks_returns_requested_records(tmp_path):
+    data_list, _, block_index = make_index(tmp_path)
+    tickers = ['T25', 'T3', 'MISSING', 'T4', 'T17', 'T3']
+    assert len(plan_ranges(block_index, tickers)) == 3
+    expected = [data_list[25], data_list[3], data_list[4], data_list[17]]
+
+    with serve(make_server(str(tmp_path), port=0, quiet=True)) as url:
+        assert fetch_ticker_blocks(f"{url}/test_index_data.blocks", block_index, tickers) == expected
+        assert fetch_ticker_blocks(f"{url}/test_index_data.blocks", block_index, ['MISSING']) == []
+
+    no_range = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(NoRangeHandler, directory=str(tmp_path)))
+    with serve(no_range) as url:
+        assert fetch_ticker_blocks(f"{url}/test_index_data.blocks", block_index, tickers) == expected
+
+
+def test_blocks_fall_back_to_full_file(tmp_path, monkeypatch):
+    data_list, blob_file, _ = make_index(tmp_path)
+    with serve(make_server(str(tmp_path), port=0, quiet=True)) as url:
+        monkeypatch.setitem(screening.index_file_map, 'Test Index', f"{url}/test_index_data.json")
+        assert screening.fetch_ticker_data_from_blocks('Test Index', ['T1', 'T2'], 'intact') == data_list[1:3]
+
+        with open(blob_file, 'r+b') as f:
+            f.write(b'\0' * 64)
+        assert screening.fetch_ticker_data_from_blocks('Test Index', ['T0', 'T1'], 'corrupt') is None
+
+        monkeypatch.setitem(screening.index_file_map, 'Test Index', f"{url}/missing_data.json")
+        assert screening.fetch_ticker_data_from_blocks('Test Index', ['T1'], 'missing') is None
+
+
+def test_small_screens_reuse_loaded_index_metrics(monkeypatch):
+    index_metrics = pd.DataFrame({'Ticker': [f'T{i}' for i in range(100)], 'Revenue Growth': range(100)})
+    calls = []
+    monkeypatch.setattr(screening, 'loaded_index_metrics', set())
+    monkeypatch.setattr(screening, 'compute_index_metrics', lambda *args: calls.append('index') or index_metrics)
+    monkeypatch.setattr(screening, 'compute_ticker_metrics', lambda *args: calls.append('ranged') or index_metrics.iloc[:2])
+
+    screening.compute_screen_metrics('Test Index', ['T1', 'T2'], 'YoY', 'v1')
+    assert calls == ['ranged']
+
+    screening.loaded_index_metrics.add(('Test Index', 'YoY', 'v1'))
+    df = screening.compute_screen_metrics('Test Index', ['T5', 'T7'], 'YoY', 'v1')
+    assert calls == ['ranged', 'index']
+    assert df['Ticker'].tolist() == ['T5', 'T7']
+
+    # Another data version is not loaded yet
+    screening.compute_screen_metrics('Test Index', ['T5'], 'YoY', 'v2')
+    assert calls == ['ranged', 'index', 'ranged']
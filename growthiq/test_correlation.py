@@ -0,0 +1,67 @@
+# test_correlation.py
+import numpy as np
+import pandas as pd
+
+from correlation import MIN_OBSERVATIONS, average_linkage, correlation_matrix, cut_clusters, rolling_betas
+
+
+# Function to build correlated daily returns with gaps and a short-lived ticker
+def make_returns(n_days=300, n_tickers=40, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, n_days)
+    loadings = rng.uniform(0, 1.5, n_tickers)
+    returns = market[:, None] * loadings + rng.normal(0, 0.01, (n_days, n_tickers))
+    returns[rng.random(returns.shape) < 0.1] = np.nan
+    returns[:n_days - 15, -1] = np.nan
+    return pd.DataFrame(returns, columns=[f'T{i}' for i in range(n_tickers)]), pd.Series(market)
+
+
+def test_correlation_matrix_matches_pandas():
+    returns, _ = make_returns()
+    expected = returns.corr(min_periods=MIN_OBSERVATIONS).to_numpy()
+    corr = correlation_matrix(returns.to_numpy(), block_size=16)
+    np.testing.assert_allclose(corr, expected, atol=1e-6, equal_nan=True)
+    assert np.isnan(corr[-1]).all()
+
+
+def test_rolling_betas_match_pandas():
+    returns, market = make_returns()
+    betas = rolling_betas(returns, market, window=63)
+    for ticker in returns.columns:
+        valid = returns[ticker].notna() & market.notna()
+        stock, benchmark = returns[ticker].where(valid), market.where(valid)
+        covariance = benchmark.rolling(63, min_periods=MIN_OBSERVATIONS).cov(stock)
+        variance = benchmark.rolling(63, min_periods=MIN_OBSERVATIONS).var()
+        np.testing.assert_allclose(betas[ticker], covariance / variance, rtol=1e-8, atol=1e-12, equal_nan=True)
+
+
+# Naive O(n^3) average linkage on the same correlation distance
+def reference_linkage_heights(corr):
+    distance = np.sqrt(np.clip(2 * (1 - np.nan_to_num(corr, nan=0.0)), 0, None))
+    clusters = [[i] for i in range(len(corr))]
+    heights = []
+    while len(clusters) > 1:
+        best = None
+        for a in range(len(clusters)):
+            for b in range(a + 1, len(clusters)):
+                height = distance[np.ix_(clusters[a], clusters[b])].mean()
+                if best is None or height < best[0]:
+                    best = (height, a, b)
+        height, a, b = best
+        heights.append(height)
+        clusters[a] = clusters[a] + clusters.pop(b)
+    return np.sort(heights)
+
+
+def test_average_linkage_matches_naive_linkage():
+    returns, _ = make_returns(n_tickers=30)
+    corr = returns.corr(min_periods=MIN_OBSERVATIONS).to_numpy()
+    merges = average_linkage(corr)
+    np.testing.assert_allclose(merges[:, 2], reference_linkage_heights(corr), atol=1e-12)
+    assert merges[-1, 3] == len(corr)
+
+    for n_clusters in (1, 3, 30):
+        labels = cut_clusters(merges, len(corr), n_clusters)
+        assert len(np.unique(labels)) == n_clusters
+        counts = np.bincount(labels)[1:]
+        assert (np.diff(counts) <= 0).all()
@@ -0,0 +1,72 @@
+# test_filter_index.py
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from filter_index import FLAG_COLUMNS, RSI_BANDS, FilterIndex
+
+
+# Function to build a screened result with missing flags, RSI values on the band
+# edges and rows without a sector
+def make_screened(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'Ticker': [f'T{i}' for i in range(n_rows)]}, index=rng.permutation(n_rows) * 3)
+    for column in FLAG_COLUMNS:
+        df[column] = pd.Series(rng.choice(np.array([True, False, None, np.nan], dtype=object), n_rows), index=df.index)
+    df['RSI'] = rng.choice([10.0, 30.0, 50.0, 70.0, 90.0, np.nan], n_rows)
+    df['Sector'] = rng.choice(np.array(['Technology', 'Energy', None], dtype=object), n_rows)
+    return df
+
+
+# Series-based filter the dashboard used before the bitmap index
+def reference_filter(df, flags, rsi_bands, sector, logic):
+    conditions = [df[flag] == True for flag in flags]
+    if 'Overbought' in rsi_bands:
+        conditions.append(df['RSI'] > 70)
+    if 'Oversold' in rsi_bands:
+        conditions.append(df['RSI'] < 30)
+    if sector != 'All':
+        conditions.append(df['Sector'] == sector)
+
+    if logic == 'ALL':
+        combined_condition = pd.Series(True, index=df.index)
+        for condition in conditions:
+            combined_condition &= condition
+    else:
+        combined_condition = pd.Series(False, index=df.index)
+        for condition in conditions:
+            combined_condition |= condition
+    return df[combined_condition]
+
+
+def subsets(items):
+    return [list(subset) for size in range(len(items) + 1) for subset in combinations(items, size)]
+
+
+def test_filter_index_matches_series_filter():
+    for n_rows in (0, 1, 7, 9, 64, 101):
+        df = make_screened(n_rows)
+        filter_index = FilterIndex(df)
+        for flags in subsets(FLAG_COLUMNS):
+            for rsi_bands in subsets(list(RSI_BANDS)):
+                for sector in ('All', 'Energy', 'Utilities'):
+                    for logic in ('ALL', 'ANY'):
+                        result = filter_index.apply(df, flags, rsi_bands, sector, logic)
+                        expected = reference_filter(df, flags, rsi_bands, sector, logic)
+                        pd.testing.assert_frame_equal(result, expected, obj=str((n_rows, flags, rsi_bands, sector, logic)))
+
+
+def test_no_filters_selected():
+    df = make_screened(13)
+    filter_index = FilterIndex(df)
+    assert len(filter_index.apply(df, logic='ALL')) == 13
+    assert filter_index.apply(df, logic='ANY').empty
+
+
+def test_rsi_band_edges_are_exclusive():
+    df = pd.DataFrame({'RSI': [29.99, 30.0, 50.0, 70.0, 70.01, None]})
+    filter_index = FilterIndex(df)
+    assert filter_index.evaluate(rsi_bands=['Overbought']).tolist() == [4]
+    assert filter_index.evaluate(rsi_bands=['Oversold']).tolist() == [0]
+    assert filter_index.sector_names() == []
@@ -0,0 +1,77 @@
+# test_fundamentals.py
+import numpy as np
+import pandas as pd
+
+from fundamentals import (
+    CAGR_HORIZONS, GROWTH_PERIODS, available_cagr_horizons, compute_fundamental_metrics, trend_conditions,
+)
+
+
+# Function to build a quarter x ticker panel with gaps, losses and ragged ends
+def make_panel(n_quarters=16, n_tickers=40, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0.03, 0.1, (n_quarters, n_tickers)), axis=0)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[:, :5] -= 120
+    values[-rng.integers(0, 3, n_tickers), np.arange(n_tickers)] = np.nan
+    return pd.DataFrame(
+        values, index=pd.period_range('2021Q1', periods=n_quarters, freq='Q'),
+        columns=[f'T{i}' for i in range(n_tickers)],
+    )
+
+
+# Per-ticker reference of the trend metrics at the ticker's latest reported quarter
+def reference_metrics(series, name, periods):
+    latest = series.last_valid_index()
+    if latest is None:
+        return {}
+    base = series.shift(periods)
+    growth = ((series / base - 1) * 100).where(base > 0)
+    metrics = {
+        f'{name} TTM': series.rolling(4, min_periods=4).sum()[latest],
+        f'{name} Acceleration': (growth - growth.shift(1))[latest],
+    }
+    for label, quarters in CAGR_HORIZONS.items():
+        start = series.shift(quarters)[latest]
+        end = series[latest]
+        metrics[f'{name} CAGR {label}'] = ((end / start) ** (4 / quarters) - 1) * 100 if start > 0 and end > 0 else np.nan
+
+    streak = 0
+    rising = (series > base).loc[:latest]
+    for value in rising[::-1]:
+        if not value:
+            break
+        streak += 1
+    metrics[f'{name} Growth Streak'] = streak
+    return metrics
+
+
+def test_fundamental_metrics_match_per_ticker_reference():
+    panel = make_panel()
+    for growth_type, periods in GROWTH_PERIODS.items():
+        metrics = compute_fundamental_metrics({'Revenue': panel}, growth_type)
+        for ticker in panel.columns:
+            for column, expected in reference_metrics(panel[ticker], 'Revenue', periods).items():
+                np.testing.assert_allclose(metrics.loc[ticker, column], expected, rtol=1e-10, equal_nan=True, err_msg=f"{growth_type} {ticker} {column}")
+
+
+def test_available_cagr_horizons():
+    # Five quarters, as in yfinance's quarterly statements, only support the 1Y CAGR
+    metrics = compute_fundamental_metrics({'Revenue': make_panel(n_quarters=5)})
+    assert available_cagr_horizons(metrics) == ['1Y']
+    assert available_cagr_horizons(compute_fundamental_metrics({'Revenue': make_panel()})) == list(CAGR_HORIZONS)
+    assert available_cagr_horizons(compute_fundamental_metrics({'Revenue': make_panel(n_quarters=4)})) == []
+
+
+def test_trend_conditions():
+    df = pd.DataFrame({
+        'Revenue TTM': [500.0, 2000.0],
+        'Revenue CAGR 1Y': [5.0, 30.0],
+        'Revenue Growth Streak': [1.0, 4.0],
+        'Revenue Acceleration': [-1.0, 2.0],
+    })
+    criteria = {'metric': 'Revenue', 'ttm_min': 1000, 'cagr_horizon': '1Y', 'cagr_min': 10, 'streak_min': 2, 'accelerating': True}
+    conditions = trend_conditions(df, criteria)
+    assert len(conditions) == 4
+    assert np.logical_and.reduce(conditions).tolist() == [False, True]
+    assert trend_conditions(df, {'metric': 'Revenue', 'ttm_min': 0, 'cagr_min': None, 'streak_min': 0}) == []
@@ -0,0 +1,40 @@
+# test_providers.py
+import pandas as pd
+import pytest
+
+from providers import FakeProvider, PriceProvider, fetch_price_history
+
+TICKERS = [f'T{i}' for i in range(7)]
+
+
+def test_fetch_price_history_batches_and_retries():
+    provider = FakeProvider(fail_tickers=['T4'], flaky_tickers=['T1', 'T6'], end='2024-06-28')
+    histories, missing = fetch_price_history(TICKERS + ['T0'], provider, period='1mo', chunk_size=3, retries=2)
+
+    # Three chunk requests, one retry per flaky ticker and two for the failing one
+    assert provider.requests == 3 + 2 + 2
+    assert missing == ['T4']
+    assert sorted(histories) == sorted(set(TICKERS) - {'T4'})
+    for ticker, history in histories.items():
+        expected = provider.make_history(ticker, '1mo')['Close']
+        assert pd.Series(history['Close'].to_numpy()).equals(pd.Series(expected.to_numpy())), ticker
+
+
+# Provider whose batched downloads always fail
+class FailingDownloads(FakeProvider):
+    def download(self, tickers, period='1y'):
+        self.requests += 1
+        raise ConnectionError("rate limited")
+
+
+def test_fetch_price_history_retries_failed_chunks():
+    provider = FailingDownloads(end='2024-06-28')
+    histories, missing = fetch_price_history(TICKERS, provider, period='1mo', chunk_size=4, retries=1)
+    assert provider.requests == 2 + len(TICKERS)
+    assert missing == []
+    assert sorted(histories) == TICKERS
+
+
+def test_providers_implement_the_interface():
+    with pytest.raises(TypeError):
+        PriceProvider()
@@ -0,0 +1,90 @@
+# test_rank_index.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from rank_index import COMPOSITE, COMPOSITE_CACHE_SIZE, RANK_METRICS, RankIndex
+
+
+# Function to build a metrics table with ties, missing values and missing sectors
+def make_metrics(n_tickers=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Ticker': [f'T{i}' for i in range(n_tickers)],
+        'Sector': rng.choice(['Technology', 'Energy', 'Healthcare', None], n_tickers),
+    })
+    for metric in RANK_METRICS:
+        values = rng.normal(size=n_tickers).round(1)
+        values[rng.random(n_tickers) < 0.1] = np.nan
+        df[metric] = values
+    return df
+
+
+# Reference selection: sort the whole table (per sector if by_sector) and take the head
+def reference_tickers(df, scores, mode, value, by_sector):
+    df = df.assign(Sector=df['Sector'].fillna('Unknown'), _score=scores).dropna(subset=['_score'])
+    groups = [group for _, group in df.groupby('Sector')] if by_sector else [df]
+    selected = []
+    for group in groups:
+        group = group.sort_values('_score', ascending=False, kind='stable')
+        count = min(int(value), len(group)) if mode == 'Top K' else math.ceil(len(group) * value / 100)
+        selected.extend(group['Ticker'].iloc[:count])
+    return selected
+
+
+def test_select_matches_full_sort():
+    df = make_metrics()
+    rank_index = RankIndex(df)
+    for metric in RANK_METRICS:
+        for mode, value in (('Top K', 25), ('Top Percentile', 10)):
+            for by_sector in (False, True):
+                result = rank_index.select(mode, metric, value, by_sector)
+                expected = reference_tickers(df, df[metric], mode, value, by_sector)
+                assert sorted(result['Ticker']) == sorted(expected), (metric, mode, by_sector)
+                groups = [group for _, group in result.groupby(result['Sector'].fillna('Unknown'), sort=False)] if by_sector else [result]
+                for group in groups:
+                    assert group['Rank'].tolist() == list(range(1, len(group) + 1))
+
+
+def test_percentile_ranks_match_pandas():
+    df = make_metrics()
+    rank_index = RankIndex(df)
+    sectors = df['Sector'].fillna('Unknown')
+    for metric in RANK_METRICS:
+        expected = df[metric].rank(method='max', pct=True) * 100
+        np.testing.assert_allclose(rank_index.percentiles[metric], expected, equal_nan=True)
+        expected = df[metric].groupby(sectors).rank(method='max', pct=True) * 100
+        np.testing.assert_allclose(rank_index.sector_percentiles[metric], expected, equal_nan=True)
+
+
+def test_composite_score_is_weighted_mean_of_percentiles():
+    df = make_metrics()
+    rank_index = RankIndex(df)
+    weights = pd.Series({RANK_METRICS[0]: 2.0, RANK_METRICS[3]: 1.0})
+    percentiles = df[weights.index].rank(method='max', pct=True) * 100
+    expected = (percentiles * weights).sum(axis=1, min_count=1) / (percentiles.notna() * weights).sum(axis=1)
+
+    result = rank_index.select('Top K', COMPOSITE, 30, weights=weights.to_dict())
+    np.testing.assert_allclose(result[COMPOSITE], expected.sort_values(ascending=False, kind='stable').iloc[:30])
+    assert sorted(result['Ticker']) == sorted(reference_tickers(df, expected, 'Top K', 30, False))
+    assert result['Rank'].tolist() == list(range(1, 31))
+
+
+def test_composite_rankings_are_bounded():
+    rank_index = RankIndex(make_metrics())
+    first = rank_index.select('Top K', COMPOSITE, 20, weights={RANK_METRICS[0]: 1.0})
+    for weight in range(2, 3 * COMPOSITE_CACHE_SIZE):
+        rank_index.select('Top K', COMPOSITE, 20, by_sector=weight % 2 == 0, weights={RANK_METRICS[0]: 1.0, RANK_METRICS[1]: weight})
+    assert len(rank_index.composites) == COMPOSITE_CACHE_SIZE
+    for rankings in (rank_index.percentiles, rank_index.sector_percentiles, rank_index.orders, rank_index.sector_orders):
+        assert len(rankings) == len(RANK_METRICS) + COMPOSITE_CACHE_SIZE
+
+    # An evicted weighting is computed again with the same result
+    pd.testing.assert_frame_equal(rank_index.select('Top K', COMPOSITE, 20, weights={RANK_METRICS[0]: 1.0}), first)
+
+
+def test_empty_index():
+    rank_index = RankIndex(make_metrics().iloc[:0])
+    assert rank_index.select('Top K', RANK_METRICS[0], 10).empty
+    assert rank_index.select('Top Percentile', COMPOSITE, 10, by_sector=True).empty
@@ -0,0 +1,35 @@
+# test_screening.py
+import numpy as np
+import pandas as pd
+
+import screening
+
+
+# Function to build screening metrics where each ticker passes a different mix of criteria
+def make_metrics():
+    return pd.DataFrame({
+        'Ticker': ['GROW', 'TREND', 'BOTH', 'NONE'],
+        'Revenue Growth': [30.0, 1.0, 30.0, 1.0],
+        'Net Income Growth': [30.0, 1.0, 30.0, 1.0],
+        'Free Cash Flow Growth': [30.0, 1.0, np.nan, 1.0],
+        'Relative Strength': [5.0, -5.0, 5.0, -5.0],
+        'Revenue Growth Streak': [0.0, 4.0, 4.0, 0.0],
+    })
+
+
+def test_trend_criteria_narrow_both_screening_logics(monkeypatch):
+    monkeypatch.setattr(screening, 'compute_screen_metrics', lambda *args: make_metrics())
+    tickers = ['GROW', 'TREND', 'BOTH', 'NONE']
+    trend_criteria = {'metric': 'Revenue', 'ttm_min': 0, 'cagr_min': None, 'streak_min': 2, 'accelerating': False}
+
+    def screen(filter_logic, criteria, data_version):
+        df = screening.fetch_and_process_data(
+            tickers, 'YoY', 10, 10, 10, 0, filter_logic, 'Test Index', criteria, data_version,
+        )
+        return df['Ticker'].tolist()
+
+    assert screen('ALL', None, 'trend-all') == ['GROW']
+    assert screen('ANY', None, 'trend-any') == ['GROW', 'BOTH']
+    assert screen('ALL', trend_criteria, 'trend-all') == []
+    # A trend criterion never adds tickers the thresholds rejected, even under ANY
+    assert screen('ANY', trend_criteria, 'trend-any') == ['BOTH']
@@ -0,0 +1,84 @@
+# test_shard_queue.py
+import json
+import os
+import time
+
+from prefetch_data import index_data_file, merge_shards
+from shard_queue import ShardQueue, make_shards
+
+LEASE_SECONDS = 0.2
+
+
+def make_queue(tmp_path, max_attempts=3):
+    queue = ShardQueue(str(tmp_path / 'queue.db'), lease_seconds=LEASE_SECONDS, max_attempts=max_attempts)
+    queue.enqueue('Test Index', make_shards([f'T{i}' for i in range(5)], 5))
+    return queue
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = make_queue(tmp_path)
+    stalled = queue.claim('stalled')
+    assert queue.claim('other') is None
+
+    time.sleep(LEASE_SECONDS * 2)
+    assert not queue.renew(stalled['id'], 'other')
+    reclaimed = queue.claim('other')
+    assert reclaimed['id'] == stalled['id']
+    assert reclaimed['attempt'] == 2
+
+    # The stalled worker lost the lease; its late result is discarded
+    assert not queue.renew(stalled['id'], 'stalled')
+    assert not queue.complete(stalled['id'], 'stalled', 'late.json')
+    assert queue.complete(reclaimed['id'], 'other', 'shard.json')
+    assert queue.shards('Test Index')[0]['output'] == 'shard.json'
+    assert queue.is_drained()
+
+
+def test_fail_requeues_until_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    shard = queue.claim('worker')
+    assert queue.fail(shard['id'], 'worker', 'timeout')
+    assert queue.status() == {'Test Index': {'pending': 1}}
+
+    shard = queue.claim('worker')
+    assert shard['attempt'] == 2
+    assert queue.fail(shard['id'], 'worker', 'timeout')
+    assert queue.status() == {'Test Index': {'failed': 1}}
+    assert queue.claim('worker') is None
+    assert queue.is_drained()
+
+
+def test_stalled_shard_fails_after_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=1)
+    queue.claim('stalled')
+    time.sleep(LEASE_SECONDS * 2)
+    assert queue.claim('other') is None
+    assert queue.status() == {'Test Index': {'failed': 1}}
+
+
+def test_merge_shards_reads_shard_dir_and_skips_incomplete_indices(tmp_path):
+    queue = ShardQueue(str(tmp_path / 'queue.db'), lease_seconds=LEASE_SECONDS)
+    queue.enqueue('Done Index', make_shards(['A', 'B', 'C'], 2))
+    queue.enqueue('Partial Index', make_shards(['D', 'E', 'F'], 2))
+
+    # Workers recorded paths of their own host; the files sit in the local shard directory
+    shard_dir = tmp_path / 'shards'
+    shard_dir.mkdir()
+    # Shards are claimed in queue order; the last shard of the partial index is left leased
+    shards = [queue.claim('worker') for _ in range(4)]
+    for shard in shards[:3]:
+        output = f"/elsewhere/{shard['index_name']}.shard{shard['shard_no']}.json"
+        with open(shard_dir / os.path.basename(output), 'w') as f:
+            json.dump([{'Ticker': ticker} for ticker in shard['tickers']], f)
+        assert queue.complete(shard['id'], 'worker', output)
+
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+    assert merge_shards(queue, str(shard_dir), str(output_dir)) == ['Partial Index']
+    with open(index_data_file('Done Index', str(output_dir))) as f:
+        assert [data['Ticker'] for data in json.load(f)] == ['A', 'B', 'C']
+    assert not os.path.exists(index_data_file('Partial Index', str(output_dir)))
+
+    assert merge_shards(queue, str(shard_dir), str(output_dir), allow_partial=True) == ['Partial Index']
+    with open(index_data_file('Partial Index', str(output_dir))) as f:
+        assert len(json.load(f)) == 2
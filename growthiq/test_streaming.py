@@ -0,0 +1,54 @@
+# test_streaming.py
+import numpy as np
+import pandas as pd
+
+from streaming import SMA_LENGTHS, TickerState
+
+
+# pandas_ta's ema: seeded with the SMA of the first `length` values
+def reference_ema(close, length):
+    seeded = close.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = close.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean()
+
+
+# pandas_ta's rsi: Wilder (rma) averages of gains and losses
+def reference_rsi(close, length=14):
+    change = close.diff()
+    gains = change.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    losses = (-change).clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    return 100 * gains / (gains + losses)
+
+
+# pandas_ta's macd: the signal EMA starts at the first MACD value
+def reference_macd(close, fast=12, slow=26, signal=9):
+    macd = reference_ema(close, fast) - reference_ema(close, slow)
+    signal_line = reference_ema(macd.loc[macd.first_valid_index():], signal).reindex(close.index)
+    return macd, signal_line, macd - signal_line
+
+
+def test_ticker_state_matches_pandas_indicators():
+    rng = np.random.default_rng(0)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400))))
+    state = TickerState('TEST')
+    points = pd.DataFrame([state.update(time, value) for time, value in close.items()])
+
+    for length in SMA_LENGTHS:
+        np.testing.assert_allclose(points[f'SMA_{length}'], close.rolling(length).mean(), rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(points['EMA_20'], reference_ema(close, 20), rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(points['RSI'], reference_rsi(close), rtol=1e-10, equal_nan=True)
+
+    macd, signal_line, histogram = reference_macd(close)
+    np.testing.assert_allclose(points['MACD'], macd, rtol=1e-10, atol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(points['MACD_Signal'], signal_line, rtol=1e-10, atol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(points['MACD_Hist'], histogram, rtol=1e-10, atol=1e-12, equal_nan=True)
+
+
+def test_price_above_sma_flags():
+    close = pd.Series(np.r_[np.full(20, 10.0), 11.0, 9.0])
+    state = TickerState('TEST')
+    points = [state.update(time, value) for time, value in close.items()]
+    assert not points[18]['Price Above SMA 20']
+    assert points[20]['Price Above SMA 20']
+    assert not points[21]['Price Above SMA 20']
@@ -0,0 +1,181 @@
+# warmup.py
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Readiness file consumed by health checks (python warmup.py --check)
+WARMUP_STATUS_FILE = os.environ.get(
+    'GROWTHIQ_WARMUP_STATUS', os.path.join(tempfile.gettempdir(), 'growthiq_warmup.json')
+)
+
+# Growth types pre-processed for every index
+WARMUP_GROWTH_TYPES = ['QoQ', 'YoY']
+
+# Attempts per index, with exponential backoff starting at WARMUP_RETRY_SECONDS,
+# before it is reported as failed
+WARMUP_ATTEMPTS = int(os.environ.get('GROWTHIQ_WARMUP_ATTEMPTS', 5))
+WARMUP_RETRY_SECONDS = float(os.environ.get('GROWTHIQ_WARMUP_RETRY_SECONDS', 5))
+
+# Comma-separated index names to warm (every index when unset, none when empty)
+WARMUP_INDICES = os.environ.get('GROWTHIQ_WARMUP_INDICES')
+
+
+# Readiness of the startup warm-up, shared by every session of the server process
+class WarmupState:
+    def __init__(self, index_names, status_file=WARMUP_STATUS_FILE):
+        self.lock = threading.Lock()
+        self.status_file = status_file
+        self.started_at = time.time()
+        self.finished_at = None
+        self.indices = {
+            name: {'status': 'pending', 'seconds': None, 'error': None, 'attempts': 0} for name in index_names
+        }
+        self.write()
+
+    # Update the state of one index and publish the new snapshot
+    def update(self, index_name, **fields):
+        with self.lock:
+            self.indices[index_name].update(fields)
+        self.write()
+
+    def finish(self):
+        with self.lock:
+            self.finished_at = time.time()
+        self.write()
+
+    def is_ready(self, index_name=None):
+        with self.lock:
+            if index_name is not None:
+                return self.indices.get(index_name, {}).get('status') == 'ready'
+            return all(entry['status'] == 'ready' for entry in self.indices.values())
+
+    def snapshot(self):
+        with self.lock:
+            end = self.finished_at if self.finished_at is not None else time.time()
+            return {
+                'ready': all(entry['status'] == 'ready' for entry in self.indices.values()),
+                'failed': [name for name, entry in self.indices.items() if entry['status'] == 'failed'],
+                'finished': self.finished_at is not None,
+                'duration_seconds': round(end - self.started_at, 3),
+                'indices': {name: dict(entry) for name, entry in self.indices.items()},
+            }
+
+    # Write the snapshot atomically so health checks never read a partial file
+    def write(self):
+        if not self.status_file:
+            return
+        snapshot = self.snapshot()
+        tmp_file = f"{self.status_file}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_file, self.status_file)
+        except OSError as e:
+            logging.warning(f"Could not write warm-up status to {self.status_file}: {e}")
+
+
+# Function to download and pre-process one index into the shared caches.
+# Transient failures (Wikipedia, blob storage) are retried with exponential
+# backoff; the index is only reported as failed once every attempt has failed.
+def warm_index(state, index_name, attempts=WARMUP_ATTEMPTS, retry_seconds=WARMUP_RETRY_SECONDS):
+    from screening import clear_index_caches, compute_screen_metrics, get_data_version, get_tickers
+
+    start = time.perf_counter()
+    for attempt in range(1, attempts + 1):
+        state.update(index_name, status='loading', attempts=attempt)
+        tickers, data_version = [], None
+        try:
+            tickers = get_tickers(index_name)
+            data_version = get_data_version(index_name)
+            for growth_type in WARMUP_GROWTH_TYPES:
+                if compute_screen_metrics(index_name, tickers, growth_type, data_version).empty:
+                    raise RuntimeError(f"no usable data for {growth_type} metrics")
+        except Exception as e:
+            seconds = round(time.perf_counter() - start, 3)
+            # Failed downloads are cached as empty results; drop them before retrying
+            for growth_type in WARMUP_GROWTH_TYPES:
+                clear_index_caches(index_name, tickers, growth_type, data_version)
+            if attempt == attempts:
+                state.update(index_name, status='failed', seconds=seconds, error=str(e))
+                logging.error(f"Warm-up of {index_name} failed after {attempt} attempts ({seconds}s): {e}")
+                return
+            delay = retry_seconds * 2 ** (attempt - 1)
+            state.update(index_name, status='retrying', seconds=seconds, error=str(e))
+            logging.warning(f"Warm-up of {index_name} failed (attempt {attempt}/{attempts}), retrying in {delay}s: {e}")
+            time.sleep(delay)
+        else:
+            seconds = round(time.perf_counter() - start, 3)
+            state.update(index_name, status='ready', seconds=seconds, error=None)
+            logging.info(f"Warm-up of {index_name} ready in {seconds}s")
+            return
+
+
+# Function to warm every index concurrently (downloads dominate, so threads suffice)
+def run_warmup(state, wait_for_runtime=False):
+    if wait_for_runtime:
+        # st.cache_data only shares entries with sessions once the runtime exists
+        from streamlit.runtime import Runtime
+        while not Runtime.exists():
+            time.sleep(0.1)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(state.indices)), thread_name_prefix='warmup') as pool:
+        list(pool.map(lambda index_name: warm_index(state, index_name), state.indices))
+    state.finish()
+    logging.info(f"Warm-up finished in {state.snapshot()['duration_seconds']}s")
+
+
+_warmup_state = None
+_warmup_lock = threading.Lock()
+
+
+# Function to start the warm-up once per server process and return its state
+def start_warmup(wait_for_runtime=False):
+    global _warmup_state
+    with _warmup_lock:
+        if _warmup_state is None:
+            from screening import index_file_map
+
+            if WARMUP_INDICES is None:
+                index_names = list(index_file_map)
+            else:
+                index_names = [name.strip() for name in WARMUP_INDICES.split(',') if name.strip() in index_file_map]
+            _warmup_state = WarmupState(index_names)
+            threading.Thread(
+                target=run_warmup,
+                args=(_warmup_state, wait_for_runtime),
+                name='growthiq-warmup',
+                daemon=True,
+            ).start()
+        return _warmup_state
+
+
+# Function to check the published readiness; returns a process exit code
+def check_warmup_status(status_file=WARMUP_STATUS_FILE):
+    try:
+        with open(status_file, 'r') as f:
+            status = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warm-up status unavailable: {e}")
+        return 1
+
+    for name, entry in status['indices'].items():
+        print(f"{name}: {entry['status']} ({entry['seconds']}s, attempt {entry.get('attempts', 1)})")
+    if status['ready']:
+        print(f"Warm-up ready after {status['duration_seconds']}s")
+    elif status.get('failed'):
+        print(f"Warm-up failed for {', '.join(status['failed'])}: {len(status['failed'])} index(es) gave up after every retry")
+    else:
+        print(f"Warm-up still in progress after {status['duration_seconds']}s")
+    return 0 if status['ready'] else 1
+
+
+if __name__ == "__main__":
+    if '--check' in sys.argv:
+        sys.exit(check_warmup_status())
+    print("Usage: python warmup.py --check")
+    sys.exit(2)